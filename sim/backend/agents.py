@@ -1,9 +1,14 @@
+import heapq
 import math
 import random
+import numpy as np
 from models import (
     Character, SimulationState, Action, ActionType, Event, EventType,
-    MemoryEntry, EmotionalState, ChatMessage,
+    Memory, MemoryEntry, MemorySummary, EmotionalState, ChatMessage,
 )
+from scoring import ScoringKernel, Candidate, Options, ACTIONS, BELIEF_CODES
+from memory_index import classify, retention_priority
+from columns import CharacterColumns, EMOTIONS
 
 
 PERSONALITY_ACTION_WEIGHTS: dict[str, dict[ActionType, float]] = {
@@ -79,43 +84,97 @@ EMOTION_ACTION_MAP: dict[str, dict[ActionType, float]] = {
 }
 
 
+# Remembered help (positive) or harm (negative) toward a target raises or lowers these actions against them.
+MEMORY_SIGN = np.array([
+    1.0 if a in {ActionType.COOPERATE, ActionType.ALLY, ActionType.SHARE}
+    else -1.0 if a in {ActionType.ATTACK, ActionType.BETRAY, ActionType.COMPETE}
+    else 0.0
+    for a in ACTIONS
+])
+
+RECENT_EVENT_TICKS = 3
+
+COMPACTION_MIN_GROUP = 3
+
+
+EMOTION_DECAY = 0.05
+# Share of each emotion kept from one tick to the next; surprise fades three times as fast.
+EMOTION_RETENTION = np.array([1 - EMOTION_DECAY * (3 if e == "surprise" else 1) for e in EMOTIONS])
+
+
 def _clamp(value: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, value))
 
 
+def recall_effect(content: str) -> float:
+    """How a recalled memory shifts the score of helping its related characters."""
+    lowered = content.lower()
+    if any(w in lowered for w in ["betray", "attack", "stole", "lied"]):
+        return -0.3
+    if any(w in lowered for w in ["helped", "cooperat", "shared", "ally"]):
+        return 0.2
+    return 0.0
+
+
+def _candidate(options: Options, index: int, nearby: list[dict]) -> Candidate:
+    target = options.targets[index]
+    return Candidate(
+        ACTIONS[options.actions[index]], nearby[target]["id"] if target >= 0 else None, float(options.scores[index]),
+    )
+
+
+def _top(scores: np.ndarray, n: int) -> list[int]:
+    """Indices of the n highest scores, highest first; ties go to the lower index, as with heapq.nlargest."""
+    if n < len(scores):
+        kth = np.partition(scores, len(scores) - n)[len(scores) - n]
+        above = np.flatnonzero(scores > kth)
+        top = np.concatenate([above, np.flatnonzero(scores == kth)[:n - len(above)]])
+    else:
+        top = np.arange(len(scores))
+    return top[np.lexsort((top, -scores[top]))].tolist()
+
+
+def _dominant_trait(character: Character) -> str:
+    return max(
+        ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"],
+        key=lambda t: getattr(character.traits, t),
+    )
+
+
 class AgentBrain:
 
+    def __init__(self):
+        self.kernel = ScoringKernel(PERSONALITY_ACTION_WEIGHTS, EMOTION_ACTION_MAP, GOAL_ACTION_MAP)
+
+    def base_scores(self, columns: CharacterColumns, characters: list[Character]) -> np.ndarray:
+        return self.kernel.base_scores_in(columns, columns.slots_of(characters), [c.goals for c in characters])
+
     def perceive(self, character: Character, state: SimulationState) -> dict:
         nearby_chars: list[dict] = []
-        for cid, other in state.characters.items():
-            if cid == character.id or not other.alive:
-                continue
-            dx = other.position["x"] - character.position["x"]
-            dy = other.position["y"] - character.position["y"]
-            dist = math.sqrt(dx * dx + dy * dy)
-
-            visibility = state.config.information_symmetry
-            visible = dist < 200 * visibility + 50
-
-            if visible:
-                relationship = character.relationships.get(cid, 0.0)
-                belief = character.memory.beliefs.get(cid)
-                nearby_chars.append({
-                    "id": cid,
-                    "name": other.name,
-                    "distance": dist,
-                    "relationship": relationship,
-                    "belief": belief,
-                    "last_action": other.last_action.type.value if other.last_action else None,
-                    "resources_visible": {
-                        k: v for k, v in other.resources.items()
-                    } if visibility > 0.7 else {},
-                })
-
-        recent_events = [
-            e for e in state.events
-            if e.tick >= state.tick - 3 and character.id in e.participants
-        ]
+        visibility = state.config.information_symmetry
+        radius = 200 * visibility + 50
+        neighbors = []
+        for cid, dist in state.spatial.query_radius(character.position["x"], character.position["y"], radius):
+            other = state.characters.get(cid)
+            if cid != character.id and other is not None and other.alive:
+                neighbors.append((cid, dist, other))
+        relationships = state.relationships_toward(character.id, [cid for cid, _, _ in neighbors]).tolist()
+
+        for (cid, dist, other), relationship in zip(neighbors, relationships):
+            belief = character.memory.beliefs.get(cid)
+            nearby_chars.append({
+                "id": cid,
+                "name": other.name,
+                "distance": dist,
+                "relationship": relationship,
+                "belief": belief,
+                "last_action": other.last_action.type.value if other.last_action else None,
+                "resources_visible": {
+                    k: v for k, v in other.resources.items()
+                } if visibility > 0.7 else {},
+            })
+
+        recent_events = state.events.recent_for(character.id, state.tick - RECENT_EVENT_TICKS)
 
         nearby_locations = []
         for loc in state.environment.locations:
@@ -136,104 +195,70 @@ class AgentBrain:
 
     def recall_relevant_memories(self, character: Character, context: str) -> list[MemoryEntry]:
         keywords = set(context.lower().split())
-        relevant: list[tuple[MemoryEntry, float]] = []
+        return character.memory.index.search(keywords, character.memory.short_term, limit=10)
 
-        all_memories = character.memory.short_term + character.memory.long_term
-        for mem in all_memories:
-            mem_words = set(mem.content.lower().split())
-            overlap = len(keywords & mem_words)
-            if overlap > 0:
-                score = overlap * 0.3 + mem.importance * 0.7
-                relevant.append((mem, score))
+    def recall_effects(self, character: Character, context: str) -> list[tuple[list[str], float]]:
+        """(related characters, recall_effect) of each memory recalled for context, most relevant first."""
+        return [
+            (mem.related_characters, recall_effect(mem.content))
+            for mem in self.recall_relevant_memories(character, context)
+        ]
 
-        relevant.sort(key=lambda x: x[1], reverse=True)
-        return [m for m, _ in relevant[:10]]
+    def option_scores(
+        self, character: Character, perception: dict, base_scores: np.ndarray | None = None,
+    ) -> Options:
+        nearby = perception["nearby_characters"]
+        if base_scores is None:
+            base_scores = self.kernel.base_scores([character])[0]
+        target_scores = self.kernel.target_scores(
+            base_scores,
+            np.array([nc["relationship"] for nc in nearby], dtype=float),
+            np.array([BELIEF_CODES.get(nc.get("belief"), 0) for nc in nearby], dtype=np.intp),
+            np.array([nc["distance"] for nc in nearby], dtype=float),
+        )
+        return self.kernel.options(base_scores, target_scores)
 
-    def evaluate_options(self, character: Character, perception: dict) -> list[tuple[Action, float]]:
+    def score_options(
+        self, character: Character, perception: dict, base_scores: np.ndarray | None = None,
+    ) -> list[Candidate]:
+        options = self.option_scores(character, perception, base_scores)
         nearby = perception["nearby_characters"]
-        options: list[tuple[Action, float]] = []
+        return [_candidate(options, i, nearby) for i in range(len(options.scores))]
+
+    def evaluate_options(
+        self, character: Character, perception: dict, base_scores: np.ndarray | None = None,
+    ) -> list[tuple[Action, float]]:
+        nearby_by_id = {nc["id"]: nc for nc in perception["nearby_characters"]}
+        return [
+            (self._build_action(candidate, character, perception, nearby_by_id), candidate.score)
+            for candidate in self.score_options(character, perception, base_scores)
+        ]
 
-        traits = character.traits
-        emotions = character.emotional_state
-
-        for action_type in ActionType:
-            base_score = 0.0
-
-            for trait_name, action_weights in PERSONALITY_ACTION_WEIGHTS.items():
-                trait_val = getattr(traits, trait_name)
-                weight = action_weights.get(action_type, 0.0)
-                base_score += trait_val * weight
-
-            for emotion_name, action_weights in EMOTION_ACTION_MAP.items():
-                emo_val = getattr(emotions, emotion_name, 0.0)
-                weight = action_weights.get(action_type, 0.0)
-                base_score += emo_val * weight * 0.5
-
-            goal_boost = 0.0
-            for goal in character.goals:
-                goal_lower = goal.lower()
-                for keyword, boosted_actions in GOAL_ACTION_MAP.items():
-                    if keyword in goal_lower and action_type in boosted_actions:
-                        goal_boost += 0.4
-            base_score += goal_boost
-
-            needs_target = action_type in {
-                ActionType.COOPERATE, ActionType.COMPETE, ActionType.NEGOTIATE,
-                ActionType.ALLY, ActionType.BETRAY, ActionType.ATTACK,
-                ActionType.DEFEND, ActionType.SHARE, ActionType.COMMUNICATE,
-            }
-
-            if needs_target and nearby:
-                for nc in nearby:
-                    target_score = base_score
-                    rel = nc["relationship"]
-
-                    if action_type in {ActionType.COOPERATE, ActionType.ALLY, ActionType.SHARE, ActionType.COMMUNICATE}:
-                        target_score += rel * 0.5
-                    elif action_type in {ActionType.ATTACK, ActionType.BETRAY, ActionType.COMPETE}:
-                        target_score -= rel * 0.4
-
-                    belief = nc.get("belief")
-                    if belief == "untrustworthy":
-                        if action_type in {ActionType.COOPERATE, ActionType.ALLY, ActionType.SHARE}:
-                            target_score -= 0.6
-                        elif action_type in {ActionType.DEFEND, ActionType.COMPETE}:
-                            target_score += 0.3
-                    elif belief == "ally":
-                        if action_type in {ActionType.COOPERATE, ActionType.ALLY, ActionType.SHARE}:
-                            target_score += 0.4
-                        elif action_type in {ActionType.ATTACK, ActionType.BETRAY}:
-                            target_score -= 0.7
-
-                    proximity_bonus = max(0, 1.0 - nc["distance"] / 200) * 0.2
-                    target_score += proximity_bonus
-
-                    detail = self._build_detail(action_type, character, nc)
-                    reasoning = self._build_reasoning(action_type, character, nc, target_score)
-
-                    options.append((
-                        Action(type=action_type, target_id=nc["id"], detail=detail, reasoning=reasoning),
-                        target_score,
-                    ))
-
-            elif not needs_target:
-                energy = character.resources.get("energy", 50)
-                if action_type == ActionType.REST and energy < 40:
-                    base_score += 0.5
-                elif action_type == ActionType.GATHER:
-                    if any(v < 30 for v in character.resources.values()):
-                        base_score += 0.4
-
-                detail = self._build_solo_detail(action_type, character, perception)
-                reasoning = self._build_solo_reasoning(action_type, character, base_score)
-                options.append((
-                    Action(type=action_type, detail=detail, reasoning=reasoning),
-                    base_score,
-                ))
-
-        return options
-
-    def decide(self, character: Character, state: SimulationState) -> Action:
+    def _build_action(
+        self, candidate: Candidate, character: Character, perception: dict, nearby_by_id: dict[str, dict],
+    ) -> Action:
+        if candidate.target_id is None:
+            return Action(
+                type=candidate.action_type,
+                detail=self._build_solo_detail(candidate.action_type, character, perception),
+                reasoning=self._build_solo_reasoning(candidate.action_type, character, candidate.score),
+            )
+        nc = nearby_by_id[candidate.target_id]
+        return Action(
+            type=candidate.action_type,
+            target_id=candidate.target_id,
+            detail=self._build_detail(candidate.action_type, character, nc),
+            reasoning=self._build_reasoning(candidate.action_type, character, nc, candidate.score),
+        )
+
+    def decide(self, character: Character, state: SimulationState, base_scores: np.ndarray | None = None) -> Action:
+        chosen = self.choose(character, state, base_scores)
+        character.last_action = chosen
+        character.last_reasoning = chosen.reasoning
+        return chosen
+
+    def choose(self, character: Character, state: SimulationState, base_scores: np.ndarray | None = None) -> Action:
+        """Pick the character's action for this tick without modifying the character or the state."""
         perception = self.perceive(character, state)
 
         context_parts = []
@@ -243,47 +268,33 @@ class AgentBrain:
             context_parts.append(evt.title)
         context = " ".join(context_parts)
 
-        memories = self.recall_relevant_memories(character, context)
-        memory_influence = {}
-        for mem in memories:
-            for char_id in mem.related_characters:
-                if char_id not in memory_influence:
-                    memory_influence[char_id] = 0.0
-                if any(w in mem.content.lower() for w in ["betray", "attack", "stole", "lied"]):
-                    memory_influence[char_id] -= 0.3
-                elif any(w in mem.content.lower() for w in ["helped", "cooperat", "shared", "ally"]):
-                    memory_influence[char_id] += 0.2
-
-        options = self.evaluate_options(character, perception)
-
-        for i, (action, score) in enumerate(options):
-            if action.target_id and action.target_id in memory_influence:
-                adjustment = memory_influence[action.target_id]
-                if action.type in {ActionType.COOPERATE, ActionType.ALLY, ActionType.SHARE}:
-                    score += adjustment
-                elif action.type in {ActionType.ATTACK, ActionType.BETRAY, ActionType.COMPETE}:
-                    score -= adjustment
-                options[i] = (action, score)
+        memory_influence: dict[str, float] = {}
+        for related, effect in self.recall_effects(character, context):
+            for char_id in related:
+                memory_influence[char_id] = memory_influence.get(char_id, 0.0) + effect
+
+        nearby = perception["nearby_characters"]
+        options = self.option_scores(character, perception, base_scores)
+        scores = options.scores
+        if memory_influence and nearby:
+            influence = np.array([memory_influence.get(nc["id"], 0.0) for nc in nearby])
+            targeted = np.flatnonzero(options.targets >= 0)
+            scores[targeted] += influence[options.targets[targeted]] * MEMORY_SIGN[options.actions[targeted]]
 
         randomness = state.config.randomness
-        rng = random.Random(hash((character.id, state.tick)))
-        for i, (action, score) in enumerate(options):
-            noise = rng.gauss(0, randomness * 0.5)
-            options[i] = (action, score + noise)
+        rng = np.random.default_rng(hash((character.id, state.tick)) & 0xFFFFFFFFFFFFFFFF)
+        scores += rng.normal(0, randomness * 0.5, len(scores))
 
-        if not options:
+        if not len(scores):
             return Action(type=ActionType.OBSERVE, detail="Nothing to do", reasoning="No options available")
 
-        options.sort(key=lambda x: x[1], reverse=True)
-
         temperature = 0.3 + randomness * 0.7
-        top_n = max(1, min(5, len(options)))
-        candidates = options[:top_n]
+        candidates = _top(scores, max(1, min(5, len(scores))))
 
         weights = []
-        max_score = candidates[0][1]
-        for _, score in candidates:
-            w = math.exp((score - max_score) / max(temperature, 0.01))
+        max_score = scores[candidates[0]]
+        for i in candidates:
+            w = math.exp((scores[i] - max_score) / max(temperature, 0.01))
             weights.append(w)
 
         total = sum(weights)
@@ -291,33 +302,24 @@ class AgentBrain:
 
         r = rng.random()
         cumulative = 0.0
-        chosen = candidates[0][0]
-        for (action, _), w in zip(candidates, weights):
+        chosen_index = candidates[0]
+        for i, w in zip(candidates, weights):
             cumulative += w
             if r <= cumulative:
-                chosen = action
+                chosen_index = i
                 break
 
-        character.last_action = chosen
-        character.last_reasoning = chosen.reasoning
-        return chosen
+        nearby_by_id = {nc["id"]: nc for nc in nearby}
+        return self._build_action(_candidate(options, chosen_index, nearby), character, perception, nearby_by_id)
 
-    def update_emotions(self, character: Character, events: list[Event]):
-        emo = character.emotional_state
-        decay = 0.05
-
-        emo.happiness = _clamp(emo.happiness * (1 - decay), -1, 1)
-        emo.anger = _clamp(emo.anger * (1 - decay), -1, 1)
-        emo.fear = _clamp(emo.fear * (1 - decay), -1, 1)
-        emo.trust = _clamp(emo.trust * (1 - decay), -1, 1)
-        emo.surprise = _clamp(emo.surprise * (1 - decay * 3), -1, 1)
-        emo.sadness = _clamp(emo.sadness * (1 - decay), -1, 1)
-        emo.disgust = _clamp(emo.disgust * (1 - decay), -1, 1)
+    def decay_emotions(self, emotions: np.ndarray) -> np.ndarray:
+        """One tick of emotion decay for rows of emotion columns (characters x EMOTIONS)."""
+        return np.clip(emotions * EMOTION_RETENTION, -1, 1)
 
+    def react_emotions(self, character: Character, events: list[Event]):
+        """React to events, which must all involve the character; decay is applied separately."""
+        emo = character.emotional_state
         for event in events:
-            if character.id not in event.participants:
-                continue
-
             if event.type == EventType.ALLIANCE_FORMED:
                 emo.happiness = _clamp(emo.happiness + 0.2, -1, 1)
                 emo.trust = _clamp(emo.trust + 0.3, -1, 1)
@@ -356,48 +358,113 @@ class AgentBrain:
                 emo.fear = _clamp(emo.fear + neuroticism * 0.15, -1, 1)
                 emo.anger = _clamp(emo.anger + neuroticism * 0.1, -1, 1)
 
-    def consolidate_memory(self, character: Character, events: list[Event], tick: int):
+    def consolidate_memory(
+        self, character: Character, events: list[Event], tick: int,
+        budget: int | None = None, compaction: bool = False,
+    ) -> set[str]:
+        """Remember events, which must all involve the character, and refresh beliefs.
+
+        Returns the names of the Memory fields that changed.
+        """
+        changed: set[str] = set()
+        if events:
+            changed.add("short_term")
         for event in events:
-            if character.id not in event.participants:
-                continue
-
             entry = MemoryEntry(
                 tick=tick,
                 content=f"{event.title}: {event.description}",
                 importance=event.importance,
                 related_characters=[p for p in event.participants if p != character.id],
-                emotional_context=character.emotional_state.model_copy(),
+                emotional_context=character.emotional_snapshot(),
             )
             character.memory.short_term.append(entry)
+            character.memory.index.add(entry)
 
         if len(character.memory.short_term) > 20:
             character.memory.short_term.sort(key=lambda m: m.importance, reverse=True)
             to_promote = character.memory.short_term[:5]
             character.memory.long_term.extend(to_promote)
+            for mem in to_promote:
+                character.memory.index.promote(mem)
+            for mem in character.memory.short_term[20:]:
+                character.memory.index.remove(mem)
             character.memory.short_term = character.memory.short_term[5:20]
+            changed.add("long_term")
+
+        if budget is not None and character.memory.index.long_term_count > budget:
+            self._enforce_memory_budget(character.memory, budget, compaction)
+            changed.add("long_term")
+
+        index = character.memory.index
+        beliefs = character.memory.beliefs
+        for char_id in index.take_changed():
+            before = beliefs.get(char_id)
+            betrayals = index.betrayals[char_id]
+            cooperations = index.cooperations[char_id]
+            if betrayals >= 3:
+                beliefs[char_id] = "untrustworthy"
+            elif betrayals >= 2 and cooperations < betrayals:
+                beliefs[char_id] = "suspicious"
+            if cooperations >= 3 and betrayals == 0:
+                beliefs[char_id] = "ally"
+            elif cooperations >= 2 and betrayals == 0:
+                beliefs[char_id] = "friendly"
+            if beliefs.get(char_id) != before:
+                changed.add("beliefs")
+        return changed
+
+    def _enforce_memory_budget(self, memory: Memory, budget: int, compaction: bool):
+        if compaction:
+            self._compact_long_term(memory)
+        evicted: set[str] = set()
+        while memory.index.long_term_count > budget:
+            entry = memory.index.evict_long_term()
+            if entry is None:
+                break
+            evicted.add(entry.id)
+        if evicted:
+            memory.long_term = [m for m in memory.long_term if m.id not in evicted]
+
+    def _compact_long_term(self, memory: Memory):
+        """Merge the less-retained half of long-term memory into one summary entry per counterpart set."""
+        groups: dict[tuple[str, ...], list[MemoryEntry]] = {}
+        for mem in heapq.nsmallest(len(memory.long_term) // 2, memory.long_term, key=retention_priority):
+            groups.setdefault(tuple(mem.related_characters), []).append(mem)
+
+        merged: set[str] = set()
+        summaries: list[MemoryEntry] = []
+        for counterparts, group in groups.items():
+            if len(group) < COMPACTION_MIN_GROUP:
+                continue
+            count = betrayals = cooperations = 0
+            titles: list[str] = []
+            for mem in group:
+                if mem.summary is not None:
+                    count += mem.summary.count
+                    betrayals += mem.summary.betrayals
+                    cooperations += mem.summary.cooperations
+                    titles.extend(mem.content.split(": ", 1)[-1].split("; "))
+                else:
+                    betrayal, cooperation = classify(mem.content)
+                    count += 1
+                    betrayals += betrayal
+                    cooperations += cooperation
+                    titles.append(mem.content.split(": ", 1)[0])
+                memory.index.remove(mem)
+                merged.add(mem.id)
+            summary = MemoryEntry(
+                tick=max(m.tick for m in group),
+                content=f"{count} encounters: " + "; ".join(dict.fromkeys(titles)),
+                importance=max(m.importance for m in group),
+                related_characters=list(counterparts),
+                summary=MemorySummary(count=count, betrayals=betrayals, cooperations=cooperations),
+            )
+            summaries.append(summary)
 
-        betrayal_counts: dict[str, int] = {}
-        cooperation_counts: dict[str, int] = {}
-        all_memories = character.memory.short_term + character.memory.long_term
-
-        for mem in all_memories:
-            for char_id in mem.related_characters:
-                if any(w in mem.content.lower() for w in ["betray", "attack", "stole", "lied", "backstab"]):
-                    betrayal_counts[char_id] = betrayal_counts.get(char_id, 0) + 1
-                if any(w in mem.content.lower() for w in ["cooperat", "shared", "helped", "ally", "alliance"]):
-                    cooperation_counts[char_id] = cooperation_counts.get(char_id, 0) + 1
-
-        for char_id, count in betrayal_counts.items():
-            if count >= 3:
-                character.memory.beliefs[char_id] = "untrustworthy"
-            elif count >= 2 and cooperation_counts.get(char_id, 0) < count:
-                character.memory.beliefs[char_id] = "suspicious"
-
-        for char_id, count in cooperation_counts.items():
-            if count >= 3 and betrayal_counts.get(char_id, 0) == 0:
-                character.memory.beliefs[char_id] = "ally"
-            elif count >= 2 and betrayal_counts.get(char_id, 0) == 0:
-                character.memory.beliefs[char_id] = "friendly"
+        if merged:
+            memory.long_term = [m for m in memory.long_term if m.id not in merged] + summaries
+            for summary in summaries:
+                memory.index.promote(summary)
 
     def _build_detail(self, action_type: ActionType, character: Character, nc: dict) -> str:
         name = nc["name"]
@@ -452,10 +519,7 @@ class AgentBrain:
         if belief:
             parts.append(f"believes {nc['name']} is {belief}")
 
-        dominant_trait = max(
-            ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"],
-            key=lambda t: getattr(character.traits, t),
-        )
+        dominant_trait = _dominant_trait(character)
         parts.append(f"driven by high {dominant_trait}")
 
         if character.goals:
@@ -471,10 +535,7 @@ class AgentBrain:
         if character.goals:
             parts.append(f"pursuing: {character.goals[0]}")
 
-        dominant_trait = max(
-            ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"],
-            key=lambda t: getattr(character.traits, t),
-        )
+        dominant_trait = _dominant_trait(character)
         parts.append(f"personality: high {dominant_trait}")
 
         ctx = ", ".join(parts) if parts else "general assessment"
@@ -1199,7 +1260,7 @@ class DialogueGenerator:
     def generate_reaction_dialogue(
         self, character: Character, event: Event, state: SimulationState
     ) -> ChatMessage | None:
-        if character.id not in event.participants:
+        if not event.involves(character.id):
             return None
 
         rng = random.Random(hash(("reaction", character.id, event.id)))
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable
+from models import SimulationState
+from engine import SimulationEngine
+
+MAX_VIEWS_PER_SIM = 32
+
+Key = tuple[int, int, bool]  # (tick, revision, running)
+
+
+class StateCache:
+    """Pre-encoded simulation JSON per (sim, tick, revision, view).
+
+    Concurrent misses on one key share a single serialization: the first
+    request builds the body under the simulation lock and the rest wait on
+    its future.
+    """
+
+    def __init__(self, engine: SimulationEngine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[tuple[Key, str], Future]] = {}
+
+    def key(self, sim_id: str) -> Key:
+        sim = self.engine.simulations[sim_id]
+        return (sim.tick, self.engine.revision(sim_id), sim.running)
+
+    @staticmethod
+    def etag(key: Key) -> str:
+        tick, revision, running = key
+        return f'"{tick}.{revision}.{int(running)}"'
+
+    def get(self, sim_id: str, view: str, build: Callable[[SimulationState], bytes]) -> tuple[str, bytes]:
+        """Return (etag, body) for a view, building it at most once per key."""
+        key = self.key(sim_id)
+        with self._lock:
+            entries = self._entries.setdefault(sim_id, {})
+            future = entries.get((key, view))
+            owner = future is None
+            if owner:
+                future = entries[(key, view)] = Future()
+        if owner:
+            try:
+                with self.engine.lock(sim_id):
+                    # A tick may have landed since the key was read; label the body with what was actually dumped.
+                    actual = self.key(sim_id)
+                    body = build(self.engine.simulations[sim_id])
+            except BaseException as exc:
+                with self._lock:
+                    entries.pop((key, view), None)
+                future.set_exception(exc)
+                raise
+            future.set_result((self.etag(actual), body))
+            self._store(sim_id, actual, view, future)
+        return future.result()
+
+    def _store(self, sim_id: str, key: Key, view: str, future: Future):
+        """Keep only entries for the newest key, and a bounded number of views of it."""
+        with self._lock:
+            entries = self._entries.get(sim_id)
+            if entries is None:
+                return
+            stale = [k for k in entries if k[0] != key]
+            for k in stale:
+                del entries[k]
+            if len(entries) >= MAX_VIEWS_PER_SIM:
+                entries.clear()
+            entries[(key, view)] = future
+
+    def forget(self, sim_id: str):
+        with self._lock:
+            self._entries.pop(sim_id, None)
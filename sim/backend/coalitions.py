@@ -0,0 +1,155 @@
+COALITION_SIZE = 3
+
+
+class AllianceGraph:
+    """Standing alliances between characters and the coalitions (connected groups) they form.
+
+    Groups live in a disjoint-set forest whose roots hold their member sets,
+    so forming an alliance costs O(α(N)) plus merging the smaller member set
+    into the larger, and listing a group never walks it. Breaking one (a
+    betrayal, or a member leaving) re-derives only the group it belonged to.
+    """
+
+    def __init__(self):
+        self._allies: dict[str, set[str]] = {}
+        self._parent: dict[str, str] = {}
+        self._members: dict[str, set[str]] = {}  # by root
+        self._order: dict[str, int] = {}
+        self._added = 0
+        self._formed: dict[str, int] = {}  # root -> tick its group was first reported as a coalition
+        self._grown: dict[str, None] = {}  # roots of groups that grew since the last newly_formed()
+
+    @classmethod
+    def restore(cls, allies: dict[str, list[str]], formed: dict[str, int]) -> "AllianceGraph":
+        """Rebuild a graph from the output of export()."""
+        graph = cls()
+        for node in allies:
+            graph._add(node)
+        for node, others in allies.items():
+            for other in others:
+                if other in graph._parent:
+                    graph.link(node, other)
+        graph._grown.clear()
+        for member, tick in formed.items():
+            if member in graph._parent:
+                graph._formed[graph.find(member)] = tick
+        return graph
+
+    def export(self) -> tuple[dict[str, list[str]], dict[str, int]]:
+        """Each allied character's allies, in the order the characters first allied, and the tick
+        each reported coalition formed, keyed by its oldest member."""
+        order = self._order.__getitem__
+        allies = {node: sorted(self._allies[node], key=order) for node in self._order if self._allies[node]}
+        formed = {min(self._members[root], key=order): tick for root, tick in self._formed.items()}
+        return allies, formed
+
+    def _add(self, node: str):
+        if node in self._parent:
+            return
+        self._allies[node] = set()
+        self._parent[node] = node
+        self._members[node] = {node}
+        self._order[node] = self._added
+        self._added += 1
+
+    def find(self, node: str) -> str:
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def link(self, a: str, b: str):
+        self._add(a)
+        self._add(b)
+        if b in self._allies[a]:
+            return
+        self._allies[a].add(b)
+        self._allies[b].add(a)
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if len(self._members[root_a]) < len(self._members[root_b]):
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._members[root_a] |= self._members.pop(root_b)
+        formed = [self._formed.pop(root, None) for root in (root_a, root_b)]
+        if formed != [None, None]:
+            self._formed[root_a] = min(tick for tick in formed if tick is not None)
+        self._grown.pop(root_b, None)
+        self._grown[root_a] = None
+
+    def unlink(self, a: str, b: str):
+        if b not in self._allies.get(a, ()):
+            return
+        self._allies[a].discard(b)
+        self._allies[b].discard(a)
+        self._regroup(self.find(a), [a, b])
+
+    def remove(self, node: str):
+        if node not in self._parent:
+            return
+        root = self.find(node)
+        allies = self._allies.pop(node)
+        for ally in allies:
+            self._allies[ally].discard(node)
+        del self._parent[node]
+        del self._order[node]
+        # Regrouping re-points every remaining member, including any whose pointer went through node.
+        self._regroup(root, list(allies))
+
+    def _component(self, start: str) -> list[str]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for ally in self._allies[stack.pop()]:
+                if ally not in seen:
+                    seen.add(ally)
+                    stack.append(ally)
+        return sorted(seen, key=self._order.__getitem__)
+
+    def _regroup(self, root: str, starts: list[str]):
+        """Split the group under root into its connected parts after edges were removed from it."""
+        formed = self._formed.pop(root, None)
+        grown = root in self._grown
+        self._grown.pop(root, None)
+        del self._members[root]
+        placed: set[str] = set()
+        for start in starts:
+            if start in placed:
+                continue
+            members = self._component(start)
+            placed.update(members)
+            new_root = members[0]
+            for member in members:
+                self._parent[member] = new_root
+            self._members[new_root] = set(members)
+            if len(members) >= COALITION_SIZE:
+                if formed is not None:
+                    self._formed[new_root] = formed
+                elif grown:
+                    self._grown[new_root] = None
+
+    def members(self, node: str) -> list[str]:
+        """The group node belongs to, oldest member first."""
+        return sorted(self._members[self.find(node)], key=self._order.__getitem__)
+
+    def newly_formed(self, tick: int) -> list[list[str]]:
+        """Groups that reached COALITION_SIZE since the last call; each coalition is reported once."""
+        coalitions = []
+        for root in self._grown:
+            if len(self._members[root]) >= COALITION_SIZE and root not in self._formed:
+                self._formed[root] = tick
+                coalitions.append(self.members(root))
+        self._grown.clear()
+        return coalitions
+
+    def coalitions(self, min_size: int = COALITION_SIZE) -> list[tuple[list[str], int | None]]:
+        """(members, tick first reported) for every group of at least min_size, ordered by oldest member."""
+        groups = [
+            (self.members(root), self._formed.get(root))
+            for root, members in self._members.items()
+            if len(members) >= min_size
+        ]
+        groups.sort(key=lambda group: self._order[group[0][0]])
+        return groups
@@ -0,0 +1,317 @@
+import heapq
+from collections.abc import Iterator, MutableMapping
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from models import Character
+
+TRAITS = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+EMOTIONS = ("happiness", "anger", "fear", "trust", "surprise", "disgust", "sadness")
+TRUST = EMOTIONS.index("trust")
+
+
+class CharacterColumns:
+    """Struct-of-arrays store of the characters' numeric state, one dense slot per character.
+
+    Positions, emotions and resources live only here: adding a character
+    copies its values in and rebinds its position, emotional_state and
+    resources to row views (PositionRow, EmotionRow, ResourceRow), and the
+    Character models build plain values from those views when serialized.
+    The engine's population-wide passes (movement, emotion decay, resource
+    outcomes) run directly on the arrays. Slots of removed characters are
+    reused by later additions.
+
+    relationships[i, j] is how slot i feels about slot j. It is the source of
+    truth for relationships; Character.relationships mirrors its non-default
+    entries for serialization.
+
+    resources[i, k] is slot i's amount of resource_names[k], NaN where the
+    character lacks that resource.
+
+    Population aggregates over living characters (resource totals and their
+    sum, the richest character, the trust sum) are kept up to date as rows
+    change, so emergent-event checks read them in O(1).
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._used = 0
+        self.positions = np.zeros((capacity, 2))
+        self.traits = np.zeros((capacity, len(TRAITS)))
+        self.emotions = np.zeros((capacity, len(EMOTIONS)))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.relationships = np.zeros((capacity, capacity))
+        self.resources = np.zeros((capacity, 0))
+        self.resource_names: list[str] = []
+        self._resource_columns: dict[str, int] = {}
+        self.resource_totals = np.zeros(capacity)
+        self.resource_sum = 0.0
+        self.trust_sum = 0.0
+        self.living = 0
+        self._ids: dict[int, str] = {}
+        self._added = np.zeros(capacity, dtype=np.int64)  # addition sequence, so ties go to the oldest
+        self._additions = 0
+        self._richest: list[tuple[float, int, int]] = []  # max-heap of (-total, addition, slot), pruned lazily
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _grow(self):
+        capacity = len(self.alive) * 2
+        for name in ("positions", "traits", "emotions", "alive", "resource_totals", "_added"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        relationships = np.zeros((capacity, capacity))
+        relationships[:len(self.relationships), :len(self.relationships)] = self.relationships
+        self.relationships = relationships
+        resources = np.full((capacity, len(self.resource_names)), np.nan)
+        resources[:len(self.resources)] = self.resources
+        self.resources = resources
+
+    def resource_column(self, name: str) -> int:
+        """Column of a resource, adding one (NaN for every slot) the first time the name is seen."""
+        col = self._resource_columns.get(name)
+        if col is None:
+            col = self._resource_columns[name] = len(self.resource_names)
+            self.resource_names.append(name)
+            self.resources = np.hstack([self.resources, np.full((len(self.resources), 1), np.nan)])
+        return col
+
+    def add(self, character: "Character") -> int:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._used == len(self.alive):
+                self._grow()
+            slot = self._used
+            self._used += 1
+        self.slots[character.id] = slot
+        self._ids[slot] = character.id
+        self._additions += 1
+        self._added[slot] = self._additions
+        self.load(character)
+        return slot
+
+    def remove(self, char_id: str):
+        slot = self.slots.pop(char_id, None)
+        if slot is None:
+            return
+        if self.alive[slot]:
+            self.living -= 1
+            self.resource_sum -= self.resource_totals[slot]
+            self.trust_sum -= self.emotions[slot, TRUST]
+        del self._ids[slot]
+        self._added[slot] = 0
+        self.resource_totals[slot] = 0.0
+        self.positions[slot] = 0.0
+        self.traits[slot] = 0.0
+        self.emotions[slot] = 0.0
+        self.resources[slot] = np.nan
+        self.alive[slot] = False
+        self.relationships[slot, :] = 0.0
+        self.relationships[:, slot] = 0.0
+        self._free.append(slot)
+
+    def load(self, character: "Character"):
+        """Copy a character's model values into its row, then bind the character to views of that row."""
+        slot = self.slots[character.id]
+        self.alive[slot] = character.alive
+        self.living += int(character.alive)
+        self.positions[slot] = (character.position["x"], character.position["y"])
+        self.traits[slot] = [getattr(character.traits, t) for t in TRAITS]
+        self.emotions[slot] = [getattr(character.emotional_state, e) for e in EMOTIONS]
+        if character.alive:
+            self.trust_sum += float(self.emotions[slot, TRUST])
+        for name, value in character.resources.items():
+            col = self.resource_column(name)
+            self.resources[slot, col] = value
+        self._refresh_totals(np.array([slot]))
+        character.position = PositionRow(self, slot)
+        character.emotional_state = EmotionRow(self, slot)
+        character.resources = ResourceRow(self, slot)
+
+    def load_relationships(self, character: "Character"):
+        """Copy a character's relationships dict into its row; entries for unknown ids are dropped."""
+        row = self.relationships[self.slots[character.id]]
+        for other_id, value in character.relationships.items():
+            other = self.slots.get(other_id)
+            if other is not None:
+                row[other] = value
+
+    def add_relationships(self, rows: np.ndarray, cols: np.ndarray, amounts: np.ndarray):
+        """Add amounts to relationship entries, clamping to [-1, 1] after each one as if applied in order."""
+        for hit in _rounds(rows * len(self.relationships) + cols):
+            r, c = rows[hit], cols[hit]
+            self.relationships[r, c] = np.clip(self.relationships[r, c] + amounts[hit], -1, 1)
+
+    def set_emotion(self, slot: int, index: int, value: float):
+        if index == TRUST and self.alive[slot]:
+            self.trust_sum += value - float(self.emotions[slot, TRUST])
+        self.emotions[slot, index] = value
+
+    def set_emotions(self, slots: np.ndarray, values: np.ndarray):
+        """Overwrite emotion rows in bulk (e.g. after decay) and recount the trust sum."""
+        self.emotions[slots] = values
+        self.trust_sum = float(self.emotions[self.alive, TRUST].sum())
+
+    def set_resource(self, slot: int, name: str, value: float):
+        col = self.resource_column(name)
+        self.resources[slot, col] = value
+        self._refresh_totals(np.array([slot]))
+
+    def add_resources(self, rows: np.ndarray, cols: np.ndarray, amounts: np.ndarray, caps: np.ndarray):
+        """Add amounts to resource entries as if applied in order, each result floored at 0 and then
+        capped (NaN for no cap); a missing resource counts as 0.
+
+        Entries hit more than once are applied in rounds, as in add_relationships.
+        """
+        for hit in _rounds(rows * len(self.resource_names) + cols):
+            r, c, cap = rows[hit], cols[hit], caps[hit]
+            value = np.nan_to_num(self.resources[r, c]) + amounts[hit]
+            value = np.where(value > 0, value, 0.0)
+            self.resources[r, c] = np.where(np.isnan(cap) | (value < cap), value, cap)
+        self._refresh_totals(np.unique(rows))
+
+    def _refresh_totals(self, slots: np.ndarray):
+        """Recompute the resource totals of slots after their resources changed."""
+        totals = np.nansum(self.resources[slots], axis=1)
+        living = self.alive[slots]
+        self.resource_sum += float((totals - self.resource_totals[slots])[living].sum())
+        self.resource_totals[slots] = totals
+        for slot, total in zip(slots[living].tolist(), totals[living].tolist()):
+            heapq.heappush(self._richest, (-total, int(self._added[slot]), slot))
+        if len(self._richest) > 4 * self.living + 64:
+            # Drop superseded entries so the heap stays proportional to the population.
+            self._richest = [entry for entry in self._richest if self._current(entry)]
+            heapq.heapify(self._richest)
+
+    def _current(self, entry: tuple[float, int, int]) -> bool:
+        neg_total, added, slot = entry
+        return self._added[slot] == added and self.alive[slot] and self.resource_totals[slot] == -neg_total
+
+    def richest(self) -> tuple[str, float] | None:
+        """The living character with the largest resource total, and that total."""
+        heap = self._richest
+        while heap:
+            if self._current(heap[0]):
+                neg_total, _, slot = heap[0]
+                return self._ids[slot], -neg_total
+            heapq.heappop(heap)
+        return None
+
+    def slots_of(self, characters: list["Character"]) -> np.ndarray:
+        return np.array([self.slots[c.id] for c in characters], dtype=np.intp)
+
+
+def _rounds(keys: np.ndarray) -> Iterator[np.ndarray]:
+    """Masks splitting updates into rounds where the k-th update of every key lands in round k.
+
+    Each round touches a key at most once, so it can be applied as a single
+    vectorized operation while repeated updates still happen in order.
+    """
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    rounds = np.empty(len(keys), dtype=np.intp)
+    rounds[order] = np.arange(len(keys)) - np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+    for k in range(int(rounds.max(initial=-1)) + 1):
+        yield rounds == k
+
+
+class PositionRow(MutableMapping):
+    """A character's position, read and written in place in its CharacterColumns row."""
+
+    __slots__ = ("_columns", "_slot")
+    _AXES = {"x": 0, "y": 1}
+
+    def __init__(self, columns: CharacterColumns, slot: int):
+        self._columns = columns
+        self._slot = slot
+
+    def __getitem__(self, axis: str) -> float:
+        return float(self._columns.positions[self._slot, self._AXES[axis]])
+
+    def __setitem__(self, axis: str, value: float):
+        self._columns.positions[self._slot, self._AXES[axis]] = value
+
+    def __delitem__(self, axis: str):
+        raise TypeError("position axes cannot be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._AXES)
+
+    def __len__(self) -> int:
+        return len(self._AXES)
+
+
+class ResourceRow(MutableMapping):
+    """A character's resources, read and written in place in its CharacterColumns row."""
+
+    __slots__ = ("_columns", "_slot")
+
+    def __init__(self, columns: CharacterColumns, slot: int):
+        self._columns = columns
+        self._slot = slot
+
+    def get(self, name: str, default=None):
+        col = self._columns._resource_columns.get(name)
+        if col is None:
+            return default
+        value = float(self._columns.resources[self._slot, col])
+        return default if value != value else value
+
+    def __getitem__(self, name: str) -> float:
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: float):
+        self._columns.set_resource(self._slot, name, value)
+
+    def __delitem__(self, name: str):
+        if name not in self:
+            raise KeyError(name)
+        self._columns.set_resource(self._slot, name, np.nan)
+
+    def __iter__(self) -> Iterator[str]:
+        columns = self._columns
+        names = columns.resource_names
+        return iter([names[col] for col in np.flatnonzero(~np.isnan(columns.resources[self._slot]))])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self._columns.resources[self._slot])))
+
+
+class EmotionRow:
+    """A character's emotions, read and written in place in its CharacterColumns row.
+
+    Has an attribute per name in EMOTIONS, like the EmotionalState it stands in for.
+    """
+
+    __slots__ = ("_columns", "_slot")
+
+    def __init__(self, columns: CharacterColumns, slot: int):
+        self._columns = columns
+        self._slot = slot
+
+    def as_dict(self) -> dict[str, float]:
+        return dict(zip(EMOTIONS, self._columns.emotions[self._slot].tolist()))
+
+
+def _emotion(index: int) -> property:
+    def get(row: EmotionRow) -> float:
+        return float(row._columns.emotions[row._slot, index])
+
+    def set(row: EmotionRow, value: float):
+        row._columns.set_emotion(row._slot, index, value)
+
+    return property(get, set)
+
+
+for _index, _name in enumerate(EMOTIONS):
+    setattr(EmotionRow, _name, _emotion(_index))
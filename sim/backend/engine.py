@@ -1,11 +1,19 @@
 import math
+import os
 import random
+import tempfile
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+import numpy as np
 from models import (
     SimulationState, SimulationConfig, Character, CharacterCreate,
-    Action, Event, Environment, ChatMessage, House,
+    Action, Event, EventType, Environment, ChatMessage, House, AdvanceSummary, StopReason,
 )
-from agents import AgentBrain, DialogueGenerator
-from events import EventGenerator
+from agents import AgentBrain, DialogueGenerator, RECENT_EVENT_TICKS
+from events import EventGenerator, route_events
+from journal import ALL_FIELDS, ENVIRONMENT, ALLIANCES
+from parallel import ParallelDecider, PARALLEL_MIN_POPULATION
 
 HOUSE_PLOTS = [
     {"x": -30, "y": -30}, {"x": -15, "y": -35}, {"x": 0, "y": -40},
@@ -28,13 +36,43 @@ def _generate_spiral_plot(index: int) -> dict[str, float]:
     return {"x": round(math.cos(angle) * radius, 1), "y": round(math.sin(angle) * radius, 1)}
 
 
+# Most ticks a single advance() call runs, whether bounded by ticks or by until_tick.
+MAX_ADVANCE_TICKS = 10000
+
+
 class SimulationEngine:
 
-    def __init__(self):
+    def __init__(self, archive_dir: str | None = None, decide_workers: int = 0):
         self.simulations: dict[str, SimulationState] = {}
+        self.archive_dir = archive_dir or os.environ.get("SIM_ARCHIVE_DIR") or os.path.join(
+            tempfile.gettempdir(), "simulation-archive",
+        )
         self.brain = AgentBrain()
         self.event_gen = EventGenerator()
         self.dialogue = DialogueGenerator()
+        self.decider = ParallelDecider(decide_workers) if decide_workers > 1 else None
+        self._locks: dict[str, threading.RLock] = {}
+        self._revisions: dict[str, int] = {}
+        self._pending_steps: dict[str, list[tuple[Future, Callable | None]]] = {}
+        self._pending_lock = threading.Lock()
+        # Called as listener(sim, events, chat_messages) after each tick, still under the simulation lock.
+        self.listeners: list[Callable[[SimulationState, list[Event], list[ChatMessage]], None]] = []
+
+    def close(self):
+        if self.decider is not None:
+            self.decider.close()
+            self.decider = None
+
+    def lock(self, sim_id: str) -> threading.RLock:
+        """Per-simulation lock held while a simulation is mutated or serialized."""
+        return self._locks.setdefault(sim_id, threading.RLock())
+
+    def revision(self, sim_id: str) -> int:
+        """Counter bumped by every mutation of a simulation, ticks included."""
+        return self._revisions.get(sim_id, 0)
+
+    def _bump(self, sim: SimulationState):
+        self._revisions[sim.id] = self._revisions.get(sim.id, 0) + 1
 
     def create_simulation(self, config: SimulationConfig | None = None) -> SimulationState:
         sim = SimulationState()
@@ -44,8 +82,11 @@ class SimulationEngine:
         return sim
 
     def add_character(self, sim_id: str, char_create: CharacterCreate) -> Character:
-        sim = self.simulations[sim_id]
-        rng = random.Random(hash((sim_id, char_create.name, len(sim.characters))))
+        with self.lock(sim_id):
+            return self._add_character(self.simulations[sim_id], char_create)
+
+    def _add_character(self, sim: SimulationState, char_create: CharacterCreate) -> Character:
+        rng = random.Random(hash((sim.id, char_create.name, len(sim.characters))))
 
         char = Character(
             name=char_create.name,
@@ -57,23 +98,76 @@ class SimulationEngine:
             position={"x": rng.uniform(-80, 80), "y": rng.uniform(-80, 80)},
         )
         sim.characters[char.id] = char
+        sim.spatial.insert(char.id, char.position["x"], char.position["y"])
+        sim.columns.add(char)
         self._assign_house(sim, char)
+        sim.touch(char.id, ALL_FIELDS)
+        sim.touch(ENVIRONMENT, "houses")
+        self._bump(sim)
         return char
 
     def step(self, sim_id: str) -> tuple[list[Event], list[ChatMessage]]:
-        sim = self.simulations[sim_id]
-
+        with self.lock(sim_id):
+            return self._step(self.simulations[sim_id])
+
+    def step_coalesced(
+        self, sim_id: str, respond: Callable[[SimulationState, list[Event], list[ChatMessage]], Any] | None = None,
+    ) -> Any:
+        """Step once, batching with other step requests queued on the same simulation.
+
+        The first request to queue takes the lock and runs one tick per queued
+        request back to back until the queue is empty; later requests wait on
+        their result without taking the lock. Each request gets
+        respond(sim, events, chat_messages) for its own tick, computed right
+        after that tick under the same lock hold (by default the events and chat).
+        """
+        future: Future = Future()
+        with self._pending_lock:
+            queue = self._pending_steps.get(sim_id)
+            leader = queue is None
+            if leader:
+                queue = self._pending_steps[sim_id] = []
+            queue.append((future, respond))
+        if leader:
+            self._drain_steps(sim_id)
+        return future.result()
+
+    def _drain_steps(self, sim_id: str):
+        with self.lock(sim_id):
+            while True:
+                with self._pending_lock:
+                    batch = self._pending_steps[sim_id]
+                    if not batch:
+                        del self._pending_steps[sim_id]
+                        return
+                    self._pending_steps[sim_id] = []
+                sim = self.simulations.get(sim_id)
+                for i, (queued, respond) in enumerate(batch):
+                    try:
+                        if sim is None:
+                            raise KeyError(sim_id)
+                        events, chat_messages = self._step(sim)
+                        queued.set_result(respond(sim, events, chat_messages) if respond else (events, chat_messages))
+                    except Exception as exc:
+                        for failed, _ in batch[i:]:
+                            failed.set_exception(exc)
+                        break
+
+    def _step(self, sim: SimulationState) -> tuple[list[Event], list[ChatMessage]]:
         if sim.tick >= sim.config.max_ticks:
             return [], []
 
         chat_messages: list[ChatMessage] = []
 
+        living = [char for char in sim.characters.values() if char.alive]
+        chosen = self._decide(sim, living)
+
         actions: dict[str, Action] = {}
-        for char_id, char in sim.characters.items():
-            if not char.alive:
-                continue
-            action = self.brain.decide(char, sim)
-            actions[char_id] = action
+        for char, action in zip(living, chosen):
+            char.last_action = action
+            char.last_reasoning = action.reasoning
+            sim.touch(char.id, "last_action", "last_reasoning")
+            actions[char.id] = action
 
         for char_id, action in actions.items():
             char = sim.characters[char_id]
@@ -87,18 +181,22 @@ class SimulationEngine:
         interaction_events = self.event_gen.resolve_actions(sim.characters, actions, sim)
         environmental_events = self.event_gen.generate_environmental_events(sim)
         all_events_so_far = interaction_events + environmental_events
+        # Apply this tick's outcomes first so emergent checks see the resulting resources.
+        self.event_gen.apply_outcomes(all_events_so_far, sim)
         emergent_events = self.event_gen.detect_emergent_events(sim, all_events_so_far)
+        self.event_gen.apply_outcomes(emergent_events, sim)
 
         all_events = interaction_events + environmental_events + emergent_events
 
-        self.event_gen.apply_outcomes(all_events, sim)
-
-        for char in sim.characters.values():
-            if not char.alive:
-                continue
-            self.brain.update_emotions(char, all_events)
-            self.brain.consolidate_memory(char, all_events, sim.tick)
-            for event in all_events:
+        inbox = route_events(all_events, sim.characters)
+        self._update_emotions(sim, living, inbox)
+        for char in living:
+            char_events = inbox.get(char.id, [])
+            memory_fields = self.brain.consolidate_memory(
+                char, char_events, sim.tick, sim.config.memory_budget, sim.config.memory_compaction,
+            )
+            sim.touch(char.id, "emotional_state", *(f"memory.{field}" for field in memory_fields))
+            for event in char_events:
                 msg = self.dialogue.generate_reaction_dialogue(char, event, sim)
                 if msg:
                     chat_messages.append(msg)
@@ -106,24 +204,130 @@ class SimulationEngine:
         sim.events.extend(all_events)
         sim.chat_log.extend(chat_messages)
         sim.tick += 1
+        self._bump(sim)
+        self._enforce_retention(sim)
+        for listener in self.listeners:
+            listener(sim, all_events, chat_messages)
 
         return all_events, chat_messages
 
+    def _decide(self, sim: SimulationState, living: list[Character]) -> list[Action]:
+        """Decision phase: every living character's action, read from the start-of-tick state only."""
+        if self.decider is not None and len(living) >= PARALLEL_MIN_POPULATION:
+            return self.decider.choose_all(sim, living)
+        base_scores = self.brain.base_scores(sim.columns, living)
+        return [self.brain.choose(char, sim, scores) for char, scores in zip(living, base_scores)]
+
+    def _update_emotions(self, sim: SimulationState, living: list[Character], inbox: dict[str, list[Event]]):
+        """Decay everyone's emotions in one pass over the columns, then apply each character's reactions."""
+        columns = sim.columns
+        slots = columns.slots_of(living)
+        columns.set_emotions(slots, self.brain.decay_emotions(columns.emotions[slots]))
+        for char in living:
+            char_events = inbox.get(char.id)
+            if char_events:
+                self.brain.react_emotions(char, char_events)
+
+    def advance(
+        self, sim_id: str, ticks: int | None = None, until_tick: int | None = None,
+        stop_on: set[EventType] | None = None,
+    ) -> AdvanceSummary:
+        """Run ticks back to back until a tick limit, max_ticks, or an event of a stop_on type.
+
+        At most MAX_ADVANCE_TICKS run per call. The lock is taken per tick, so
+        readers and other requests can interleave with a long run.
+        """
+        with self.lock(sim_id):
+            sim = self.simulations[sim_id]
+            target = sim.tick + min(ticks or MAX_ADVANCE_TICKS, MAX_ADVANCE_TICKS)
+            if until_tick is not None:
+                target = min(target, until_tick)
+            summary = AdvanceSummary(start_tick=sim.tick, tick=sim.tick)
+
+        while True:
+            with self.lock(sim_id):
+                sim = self.simulations[sim_id]
+                if sim.tick >= min(target, sim.config.max_ticks):
+                    break
+                events, chat_messages = self._step(sim)
+            summary.ticks_run += 1
+            summary.event_count += len(events)
+            summary.chat_count += len(chat_messages)
+            for event in events:
+                summary.event_counts[event.type] = summary.event_counts.get(event.type, 0) + 1
+            if stop_on:
+                summary.stop_event = next((e for e in events if e.type in stop_on), None)
+                if summary.stop_event is not None:
+                    break
+
+        with self.lock(sim_id):
+            summary.tick = sim.tick
+            if summary.stop_event is not None:
+                summary.stop_reason = StopReason.EVENT
+            elif sim.tick >= sim.config.max_ticks:
+                summary.stop_reason = StopReason.MAX_TICKS
+            elif until_tick is not None and sim.tick >= until_tick:
+                summary.stop_reason = StopReason.UNTIL_TICK
+        return summary
+
+    def _enforce_retention(self, sim: SimulationState):
+        """Spill events and chat older than the configured hot window to the on-disk archive."""
+        window = sim.config.history_window
+        if window is None:
+            return
+        if sim.events.archive is None:
+            sim.events.attach_archive(os.path.join(self.archive_dir, f"{sim.id}-events.ndjson"), Event)
+            sim.chat_log.attach_archive(os.path.join(self.archive_dir, f"{sim.id}-chat.ndjson"), ChatMessage)
+        # Agents look back RECENT_EVENT_TICKS when perceiving, so never spill those.
+        before_tick = sim.tick - max(window, RECENT_EVENT_TICKS)
+        sim.events.spill(before_tick)
+        sim.chat_log.spill(before_tick)
+        sim.journal.prune(before_tick)
+
     def get_state(self, sim_id: str) -> SimulationState:
         return self.simulations[sim_id]
 
     def remove_character(self, sim_id: str, char_id: str):
-        sim = self.simulations[sim_id]
-        if char_id in sim.characters:
-            del sim.characters[char_id]
+        with self.lock(sim_id):
+            sim = self.simulations[sim_id]
+            if char_id in sim.characters:
+                sim.characters.pop(char_id).unbind()
+                sim.spatial.remove(char_id)
+                sim.columns.remove(char_id)
+                sim.coalitions.remove(char_id)
+                sim.touch(ALLIANCES, ALL_FIELDS)
+                for other in sim.characters.values():
+                    if other.relationships.pop(char_id, None) is not None:
+                        sim.touch(other.id, "relationships")
+                sim.journal.forget(char_id, sim.tick)
+                self._bump(sim)
 
     def update_config(self, sim_id: str, config: SimulationConfig):
-        sim = self.simulations[sim_id]
-        sim.config = config
+        with self.lock(sim_id):
+            sim = self.simulations[sim_id]
+            sim.config = config
+            self._bump(sim)
 
     def delete_simulation(self, sim_id: str):
         if sim_id in self.simulations:
-            del self.simulations[sim_id]
+            with self.lock(sim_id):
+                sim = self.simulations.pop(sim_id)
+            self._locks.pop(sim_id, None)
+            self._revisions.pop(sim_id, None)
+            for log in (sim.events, sim.chat_log):
+                if log.archive is not None:
+                    log.archive.delete()
+
+    def detach_simulation(self, sim_id: str) -> tuple[SimulationState, int]:
+        """Remove a simulation, keeping its archive, so another engine can take it over."""
+        with self.lock(sim_id):
+            sim = self.simulations.pop(sim_id)
+        self._locks.pop(sim_id, None)
+        return sim, self._revisions.pop(sim_id, 0)
+
+    def attach_simulation(self, sim: SimulationState, revision: int = 0):
+        self.simulations[sim.id] = sim
+        self._revisions[sim.id] = revision
 
     _HOUSE_SIZE_MAX = {"small": 1, "medium": 2, "large": 3}
 
@@ -196,6 +400,8 @@ class SimulationEngine:
     }
 
     def _move_characters(self, sim: SimulationState, actions: dict[str, Action]):
+        movers: list[Character] = []
+        targets: list[tuple[float, float]] = []
         for char_id, action in actions.items():
             char = sim.characters[char_id]
 
@@ -203,28 +409,34 @@ class SimulationEngine:
             if action.type.value == "rest" and char.house_id:
                 house = next((h for h in sim.environment.houses if h.id == char.house_id), None)
                 if house:
-                    target_x = house.position["x"]
-                    target_y = house.position["y"]
+                    target = (house.position["x"], house.position["y"])
                 else:
-                    target_x, target_y = self._ACTION_LOCATION_MAP["rest"]
+                    target = self._ACTION_LOCATION_MAP["rest"]
             else:
                 target = self._ACTION_LOCATION_MAP.get(action.type.value)
                 if target is None:
                     continue
-                target_x, target_y = target
-            dx = target_x - char.position["x"]
-            dy = target_y - char.position["y"]
-
-            speed = 0.3 + random.uniform(0, 0.2)
-            char.position["x"] += dx * speed
-            char.position["y"] += dy * speed
-
-            # Add random offset when near the target location
-            dist = (dx * dx + dy * dy) ** 0.5
-            if dist < 10:
-                char.position["x"] += random.uniform(-8, 8)
-                char.position["y"] += random.uniform(-8, 8)
-
-            # Clamp to world bounds
-            char.position["x"] = max(-120, min(120, char.position["x"]))
-            char.position["y"] = max(-120, min(120, char.position["y"]))
+            movers.append(char)
+            targets.append(target)
+        if not movers:
+            return
+
+        start = sim.columns.positions[sim.columns.slots_of(movers)]
+        delta = np.array(targets, dtype=float) - start
+        near = (delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]) ** 0.5 < 10
+
+        # Draws follow the per-character order of the scalar version so runs replay identically.
+        speed = np.empty(len(movers))
+        offset = np.zeros((len(movers), 2))
+        for i, is_near in enumerate(near.tolist()):
+            speed[i] = 0.3 + random.uniform(0, 0.2)
+            if is_near:
+                # Add random offset when near the target location
+                offset[i] = (random.uniform(-8, 8), random.uniform(-8, 8))
+
+        moved = start + delta * speed[:, None]
+        moved = np.where(near[:, None], moved + offset, moved)
+        # Clamp to world bounds
+        moved = np.clip(moved, -120, 120)
+        for char, (x, y) in zip(movers, moved.tolist()):
+            sim.place(char.id, x, y)
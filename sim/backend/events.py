@@ -1,12 +1,38 @@
 import math
 import random
+from typing import Iterable
+import numpy as np
 from models import (
-    Character, Action, ActionType, Event, EventType, SimulationState,
+    Character, Action, ActionType, Event, EventType, EventScope, SimulationState,
+    ResourceDelta, RelationshipDelta, AllianceDelta,
 )
+from journal import ENVIRONMENT, ALLIANCES, ALL_FIELDS
 
 
-def _clamp(value: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, value))
+def _resource(char: Character, resource: str, amount: float, cap: float | None = None) -> ResourceDelta:
+    return ResourceDelta(character_id=char.id, resource=resource, amount=amount, cap=cap)
+
+
+def _relationship(char: Character, other: Character, amount: float) -> RelationshipDelta:
+    return RelationshipDelta(character_id=char.id, target_id=other.id, amount=amount)
+
+
+def _alliance(char: Character, other: Character, allied: bool) -> AllianceDelta:
+    return AllianceDelta(character_id=char.id, target_id=other.id, allied=allied)
+
+
+def _mutual_relationship(a: Character, b: Character, amount: float) -> list[RelationshipDelta]:
+    return [_relationship(a, b, amount), _relationship(b, a, amount)]
+
+
+def route_events(events: list[Event], character_ids: Iterable[str]) -> dict[str, list[Event]]:
+    """Map each character to the events it takes part in, in event order."""
+    inbox: dict[str, list[Event]] = {char_id: [] for char_id in character_ids}
+    for event in events:
+        recipients = inbox if event.scope == EventScope.GLOBAL else dict.fromkeys(event.participants)
+        for pid in recipients:
+            inbox.setdefault(pid, []).append(event)
+    return inbox
 
 
 class EventGenerator:
@@ -110,6 +136,7 @@ class EventGenerator:
             old_val = state.environment.resources[resource]
             new_val = max(0, old_val + change)
             state.environment.resources[resource] = new_val
+            state.touch(ENVIRONMENT, "resources")
 
             if change > 0:
                 title = f"Abundance of {resource}"
@@ -121,7 +148,7 @@ class EventGenerator:
             events.append(Event(
                 tick=tick, type=EventType.ENVIRONMENTAL,
                 title=title, description=desc,
-                participants=list(state.characters.keys()),
+                scope=EventScope.GLOBAL,
                 outcomes=[f"{resource} changed by {change:+.0f}"],
                 importance=0.4 + abs(change) / 40,
             ))
@@ -132,11 +159,12 @@ class EventGenerator:
             old_weather = state.environment.conditions.get("weather", "calm")
             if new_weather != old_weather:
                 state.environment.conditions["weather"] = new_weather
+                state.touch(ENVIRONMENT, "conditions")
                 events.append(Event(
                     tick=tick, type=EventType.ENVIRONMENTAL,
                     title=f"Weather shifts to {new_weather}",
                     description=f"The weather changes from {old_weather} to {new_weather}, affecting all inhabitants.",
-                    participants=list(state.characters.keys()),
+                    scope=EventScope.GLOBAL,
                     outcomes=[f"Weather is now {new_weather}"],
                     importance=0.3,
                 ))
@@ -146,7 +174,7 @@ class EventGenerator:
                 tick=tick, type=EventType.ENVIRONMENTAL,
                 title="A mysterious discovery",
                 description="Something unusual has been found in the environment, sparking curiosity and tension.",
-                participants=list(state.characters.keys()),
+                scope=EventScope.GLOBAL,
                 outcomes=["New opportunities and dangers emerge"],
                 importance=0.7,
             ))
@@ -156,6 +184,7 @@ class EventGenerator:
             for resource, amount in state.environment.resources.items():
                 drain = scarcity * rng.uniform(0.5, 2.0)
                 state.environment.resources[resource] = max(0, amount - drain)
+            state.touch(ENVIRONMENT, "resources")
 
         return events
 
@@ -164,40 +193,15 @@ class EventGenerator:
         tick = state.tick
         characters = state.characters
 
-        alliance_members: dict[str, set[str]] = {}
-        for event in recent_events:
-            if event.type == EventType.ALLIANCE_FORMED:
-                for pid in event.participants:
-                    if pid not in alliance_members:
-                        alliance_members[pid] = set()
-                    alliance_members[pid].update(event.participants)
-
-        coalition_groups: list[set[str]] = []
-        visited: set[str] = set()
-        for member, allies in alliance_members.items():
-            if member in visited:
-                continue
-            group = set()
-            stack = [member]
-            while stack:
-                current = stack.pop()
-                if current in visited:
-                    continue
-                visited.add(current)
-                group.add(current)
-                for ally in alliance_members.get(current, set()):
-                    if ally not in visited:
-                        stack.append(ally)
-            if len(group) >= 3:
-                coalition_groups.append(group)
-
-        for group in coalition_groups:
+        # apply_outcomes has already applied this tick's alliance deltas to state.coalitions.
+        for group in state.coalitions.newly_formed(tick):
+            state.touch(ALLIANCES, ALL_FIELDS)
             names = [characters[cid].name for cid in group if cid in characters]
             emergent.append(Event(
                 tick=tick, type=EventType.EMERGENT,
                 title="Coalition formed",
                 description=f"A powerful coalition has emerged among {', '.join(names)}. Their combined influence reshapes the balance of power.",
-                participants=list(group),
+                participants=group,
                 outcomes=["Power balance shifts", "Non-members may feel threatened"],
                 importance=0.85,
             ))
@@ -208,45 +212,36 @@ class EventGenerator:
                     tick=tick, type=EventType.EMERGENT,
                     title=f"Crisis: {resource} shortage",
                     description=f"{resource} has dropped to critically low levels ({amount:.0f}). Desperation and conflict are likely.",
-                    participants=list(characters.keys()),
+                    scope=EventScope.GLOBAL,
                     outcomes=[f"{resource} scarcity intensifies competition"],
                     importance=0.9,
                 ))
                 state.environment.conditions["scarcity"] = "severe"
+                state.touch(ENVIRONMENT, "conditions")
 
-        resource_totals: dict[str, float] = {}
-        for char in characters.values():
-            if not char.alive:
-                continue
-            total = sum(char.resources.values())
-            resource_totals[char.id] = total
-
-        if len(resource_totals) >= 2:
-            max_holder = max(resource_totals, key=resource_totals.get)
-            max_val = resource_totals[max_holder]
-            avg_val = sum(resource_totals.values()) / len(resource_totals)
+        columns = state.columns
+        richest = columns.richest() if columns.living >= 2 else None
+        if richest is not None:
+            max_holder, max_val = richest
+            avg_val = columns.resource_sum / columns.living
             if avg_val > 0 and max_val > avg_val * 2.5:
                 dominant = characters[max_holder]
                 emergent.append(Event(
                     tick=tick, type=EventType.EMERGENT,
                     title=f"{dominant.name} dominates",
                     description=f"{dominant.name} has accumulated far more resources than anyone else, creating a power imbalance.",
-                    participants=list(characters.keys()),
+                    participants=[dominant.id],
+                    scope=EventScope.GLOBAL,
                     outcomes=[f"{dominant.name} holds disproportionate power", "Others may unite against them"],
                     importance=0.8,
                 ))
 
-        trust_values = []
-        for char in characters.values():
-            if not char.alive:
-                continue
-            trust_values.append(char.emotional_state.trust)
-        if trust_values and sum(trust_values) / len(trust_values) < -0.3:
+        if columns.living and columns.trust_sum / columns.living < -0.3:
             emergent.append(Event(
                 tick=tick, type=EventType.EMERGENT,
                 title="Era of suspicion",
                 description="Trust has collapsed across the community. Everyone watches their back.",
-                participants=list(characters.keys()),
+                scope=EventScope.GLOBAL,
                 outcomes=["Cooperation becomes nearly impossible", "Betrayals become more likely"],
                 importance=0.75,
             ))
@@ -257,7 +252,7 @@ class EventGenerator:
                 tick=tick, type=EventType.EMERGENT,
                 title="Escalating violence",
                 description="Multiple conflicts have erupted. The situation is spiraling toward all-out war.",
-                participants=list(characters.keys()),
+                scope=EventScope.GLOBAL,
                 outcomes=["Fear spreads", "Alliances become crucial for survival"],
                 importance=0.85,
             ))
@@ -265,64 +260,31 @@ class EventGenerator:
         return emergent
 
     def apply_outcomes(self, events: list[Event], state: SimulationState):
+        characters = state.characters
+        columns = state.columns
+        deltas = [delta for event in events for delta in event.resource_deltas if delta.character_id in characters]
+        if deltas:
+            columns.add_resources(
+                np.array([columns.slots[d.character_id] for d in deltas], dtype=np.intp),
+                np.array([columns.resource_column(d.resource) for d in deltas], dtype=np.intp),
+                np.array([d.amount for d in deltas]),
+                np.array([np.nan if d.cap is None else d.cap for d in deltas]),
+            )
+            for char_id in dict.fromkeys(d.character_id for d in deltas):
+                state.touch(char_id, "resources")
+        state.adjust_relationships([delta for event in events for delta in event.relationship_deltas])
         for event in events:
-            for outcome in event.outcomes:
-                outcome_lower = outcome.lower()
-                for char_id in event.participants:
-                    if char_id not in state.characters:
-                        continue
-                    char = state.characters[char_id]
-
-                    if "gains" in outcome_lower or "received" in outcome_lower:
-                        for res_name in char.resources:
-                            if res_name in outcome_lower:
-                                try:
-                                    parts = outcome_lower.split()
-                                    for i, p in enumerate(parts):
-                                        if p in ("gains", "received", "gets"):
-                                            val = float(parts[i + 1])
-                                            char.resources[res_name] = char.resources.get(res_name, 0) + val
-                                            break
-                                except (IndexError, ValueError):
-                                    pass
-
-                    if "loses" in outcome_lower or "lost" in outcome_lower:
-                        for res_name in char.resources:
-                            if res_name in outcome_lower:
-                                try:
-                                    parts = outcome_lower.split()
-                                    for i, p in enumerate(parts):
-                                        if p in ("loses", "lost"):
-                                            val = float(parts[i + 1])
-                                            char.resources[res_name] = max(0, char.resources.get(res_name, 0) - val)
-                                            break
-                                except (IndexError, ValueError):
-                                    pass
-
-            if event.type == EventType.ALLIANCE_FORMED:
-                for i, pid1 in enumerate(event.participants):
-                    for pid2 in event.participants[i + 1:]:
-                        if pid1 in state.characters and pid2 in state.characters:
-                            c1 = state.characters[pid1]
-                            c2 = state.characters[pid2]
-                            c1.relationships[pid2] = _clamp(c1.relationships.get(pid2, 0) + 0.3, -1, 1)
-                            c2.relationships[pid1] = _clamp(c2.relationships.get(pid1, 0) + 0.3, -1, 1)
-
-            elif event.type == EventType.CONFLICT:
-                for i, pid1 in enumerate(event.participants):
-                    for pid2 in event.participants[i + 1:]:
-                        if pid1 in state.characters and pid2 in state.characters:
-                            c1 = state.characters[pid1]
-                            c2 = state.characters[pid2]
-                            c1.relationships[pid2] = _clamp(c1.relationships.get(pid2, 0) - 0.2, -1, 1)
-                            c2.relationships[pid1] = _clamp(c2.relationships.get(pid1, 0) - 0.2, -1, 1)
+            for delta in event.alliance_deltas:
+                if delta.character_id not in characters or delta.target_id not in characters:
+                    continue
+                if delta.allied:
+                    state.coalitions.link(delta.character_id, delta.target_id)
+                else:
+                    state.coalitions.unlink(delta.character_id, delta.target_id)
+                state.touch(ALLIANCES, ALL_FIELDS)
 
     def _mutual_cooperation(self, a: Character, b: Character, tick: int) -> Event:
         bonus = 5.0
-        a.resources["influence"] = a.resources.get("influence", 0) + bonus
-        b.resources["influence"] = b.resources.get("influence", 0) + bonus
-        a.resources["wealth"] = a.resources.get("wealth", 0) + 3
-        b.resources["wealth"] = b.resources.get("wealth", 0) + 3
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"{a.name} and {b.name} cooperate",
@@ -333,10 +295,13 @@ class EventGenerator:
                 f"{b.name} gains 5 influence and 3 wealth",
             ],
             importance=0.5,
+            resource_deltas=[
+                _resource(a, "influence", bonus), _resource(b, "influence", bonus),
+                _resource(a, "wealth", 3), _resource(b, "wealth", 3),
+            ],
         )
 
     def _one_sided_cooperation(self, cooperator: Character, other: Character, tick: int) -> Event:
-        cooperator.resources["influence"] = cooperator.resources.get("influence", 0) + 2
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"{cooperator.name} extends a hand to {other.name}",
@@ -344,17 +309,11 @@ class EventGenerator:
             participants=[cooperator.id, other.id],
             outcomes=[f"{cooperator.name} gains 2 influence from goodwill"],
             importance=0.3,
+            resource_deltas=[_resource(cooperator, "influence", 2)],
         )
 
     def _betrayal(self, betrayer: Character, victim: Character, tick: int) -> Event:
         stolen = min(10, victim.resources.get("wealth", 0))
-        betrayer.resources["wealth"] = betrayer.resources.get("wealth", 0) + stolen
-        victim.resources["wealth"] = max(0, victim.resources.get("wealth", 0) - stolen)
-        betrayer.resources["influence"] = max(0, betrayer.resources.get("influence", 0) - 8)
-
-        betrayer.relationships[victim.id] = _clamp(betrayer.relationships.get(victim.id, 0) - 0.4, -1, 1)
-        victim.relationships[betrayer.id] = _clamp(victim.relationships.get(betrayer.id, 0) - 0.6, -1, 1)
-
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"{betrayer.name} betrays {victim.name}",
@@ -366,6 +325,13 @@ class EventGenerator:
                 f"{victim.name} lost {stolen:.0f} wealth",
             ],
             importance=0.8,
+            resource_deltas=[
+                _resource(betrayer, "wealth", stolen),
+                _resource(victim, "wealth", -stolen),
+                _resource(betrayer, "influence", -8),
+            ],
+            relationship_deltas=[_relationship(betrayer, victim, -0.4), _relationship(victim, betrayer, -0.6)],
+            alliance_deltas=[_alliance(betrayer, victim, False)],
         )
 
     def _conflict(self, attacker: Character, defender: Character, tick: int, state: SimulationState) -> Event:
@@ -376,14 +342,13 @@ class EventGenerator:
 
         if atk_power > def_power:
             loot = min(8, defender.resources.get("wealth", 0))
-            attacker.resources["wealth"] = attacker.resources.get("wealth", 0) + loot
-            defender.resources["wealth"] = max(0, defender.resources.get("wealth", 0) - loot)
-            attacker.resources["energy"] = max(0, attacker.resources.get("energy", 0) - 10)
-            defender.resources["energy"] = max(0, defender.resources.get("energy", 0) - 15)
+            resource_deltas = [
+                _resource(attacker, "wealth", loot), _resource(defender, "wealth", -loot),
+                _resource(attacker, "energy", -10), _resource(defender, "energy", -15),
+            ]
             winner, loser = attacker, defender
         else:
-            attacker.resources["energy"] = max(0, attacker.resources.get("energy", 0) - 15)
-            defender.resources["energy"] = max(0, defender.resources.get("energy", 0) - 5)
+            resource_deltas = [_resource(attacker, "energy", -15), _resource(defender, "energy", -5)]
             winner, loser = defender, attacker
 
         return Event(
@@ -396,6 +361,8 @@ class EventGenerator:
                 f"{loser.name} suffers losses",
             ],
             importance=0.7,
+            resource_deltas=resource_deltas,
+            relationship_deltas=_mutual_relationship(attacker, defender, -0.2),
         )
 
     def _mutual_conflict(self, a: Character, b: Character, tick: int, state: SimulationState) -> Event:
@@ -403,18 +370,15 @@ class EventGenerator:
         a_power = a.resources.get("energy", 50) + rng.gauss(0, 10)
         b_power = b.resources.get("energy", 50) + rng.gauss(0, 10)
 
-        a.resources["energy"] = max(0, a.resources.get("energy", 0) - 20)
-        b.resources["energy"] = max(0, b.resources.get("energy", 0) - 20)
+        resource_deltas = [_resource(a, "energy", -20), _resource(b, "energy", -20)]
 
         if a_power > b_power:
             loot = min(10, b.resources.get("wealth", 0))
-            a.resources["wealth"] = a.resources.get("wealth", 0) + loot
-            b.resources["wealth"] = max(0, b.resources.get("wealth", 0) - loot)
+            resource_deltas += [_resource(a, "wealth", loot), _resource(b, "wealth", -loot)]
             result = f"{a.name} wins the brutal exchange"
         else:
             loot = min(10, a.resources.get("wealth", 0))
-            b.resources["wealth"] = b.resources.get("wealth", 0) + loot
-            a.resources["wealth"] = max(0, a.resources.get("wealth", 0) - loot)
+            resource_deltas += [_resource(b, "wealth", loot), _resource(a, "wealth", -loot)]
             result = f"{b.name} wins the brutal exchange"
 
         return Event(
@@ -424,6 +388,8 @@ class EventGenerator:
             participants=[a.id, b.id],
             outcomes=[result, "Both combatants are exhausted"],
             importance=0.8,
+            resource_deltas=resource_deltas,
+            relationship_deltas=_mutual_relationship(a, b, -0.2),
         )
 
     def _defended_attack(self, attacker: Character, defender: Character, tick: int, state: SimulationState) -> Event:
@@ -431,16 +397,14 @@ class EventGenerator:
         atk_power = attacker.resources.get("energy", 50) * 0.5 + rng.gauss(0, 5)
         def_power = defender.resources.get("energy", 50) * 0.7 + defender.resources.get("influence", 0) * 0.2
 
-        attacker.resources["energy"] = max(0, attacker.resources.get("energy", 0) - 12)
-        defender.resources["energy"] = max(0, defender.resources.get("energy", 0) - 5)
+        resource_deltas = [_resource(attacker, "energy", -12), _resource(defender, "energy", -5)]
 
         if atk_power > def_power:
             loot = min(5, defender.resources.get("wealth", 0))
-            attacker.resources["wealth"] = attacker.resources.get("wealth", 0) + loot
-            defender.resources["wealth"] = max(0, defender.resources.get("wealth", 0) - loot)
+            resource_deltas += [_resource(attacker, "wealth", loot), _resource(defender, "wealth", -loot)]
             desc = f"{attacker.name} breaks through {defender.name}'s defenses."
         else:
-            defender.resources["influence"] = defender.resources.get("influence", 0) + 5
+            resource_deltas.append(_resource(defender, "influence", 5))
             desc = f"{defender.name} successfully repels {attacker.name}'s attack, gaining respect."
 
         return Event(
@@ -450,13 +414,11 @@ class EventGenerator:
             participants=[attacker.id, defender.id],
             outcomes=[desc],
             importance=0.6,
+            resource_deltas=resource_deltas,
+            relationship_deltas=_mutual_relationship(attacker, defender, -0.2),
         )
 
     def _alliance_formed(self, a: Character, b: Character, tick: int) -> Event:
-        a.relationships[b.id] = _clamp(a.relationships.get(b.id, 0) + 0.4, -1, 1)
-        b.relationships[a.id] = _clamp(b.relationships.get(a.id, 0) + 0.4, -1, 1)
-        a.resources["influence"] = a.resources.get("influence", 0) + 5
-        b.resources["influence"] = b.resources.get("influence", 0) + 5
         return Event(
             tick=tick, type=EventType.ALLIANCE_FORMED,
             title=f"Alliance: {a.name} & {b.name}",
@@ -467,10 +429,12 @@ class EventGenerator:
                 "Both gain 5 influence",
             ],
             importance=0.7,
+            resource_deltas=[_resource(a, "influence", 5), _resource(b, "influence", 5)],
+            relationship_deltas=_mutual_relationship(a, b, 0.7),
+            alliance_deltas=[_alliance(a, b, True)],
         )
 
     def _alliance_proposed(self, proposer: Character, target: Character, tick: int) -> Event:
-        proposer.relationships[target.id] = _clamp(proposer.relationships.get(target.id, 0) + 0.1, -1, 1)
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"{proposer.name} proposes alliance to {target.name}",
@@ -478,6 +442,7 @@ class EventGenerator:
             participants=[proposer.id, target.id],
             outcomes=[f"{target.name} may consider the alliance next turn"],
             importance=0.4,
+            relationship_deltas=[_relationship(proposer, target, 0.1)],
         )
 
     def _mutual_negotiation(self, a: Character, b: Character, tick: int) -> Event:
@@ -486,17 +451,12 @@ class EventGenerator:
 
         exchange = 3.0
         if a_skill > b_skill:
-            a.resources["wealth"] = a.resources.get("wealth", 0) + exchange
-            b.resources["wealth"] = max(0, b.resources.get("wealth", 0) - exchange * 0.5)
+            resource_deltas = [_resource(a, "wealth", exchange), _resource(b, "wealth", -exchange * 0.5)]
             outcome_detail = f"{a.name} gets a better deal"
         else:
-            b.resources["wealth"] = b.resources.get("wealth", 0) + exchange
-            a.resources["wealth"] = max(0, a.resources.get("wealth", 0) - exchange * 0.5)
+            resource_deltas = [_resource(b, "wealth", exchange), _resource(a, "wealth", -exchange * 0.5)]
             outcome_detail = f"{b.name} gets a better deal"
 
-        a.relationships[b.id] = _clamp(a.relationships.get(b.id, 0) + 0.1, -1, 1)
-        b.relationships[a.id] = _clamp(b.relationships.get(a.id, 0) + 0.1, -1, 1)
-
         return Event(
             tick=tick, type=EventType.NEGOTIATION,
             title=f"{a.name} and {b.name} negotiate",
@@ -504,10 +464,11 @@ class EventGenerator:
             participants=[a.id, b.id],
             outcomes=[outcome_detail, "Both parties gain rapport"],
             importance=0.5,
+            resource_deltas=resource_deltas,
+            relationship_deltas=_mutual_relationship(a, b, 0.1),
         )
 
     def _negotiation_attempt(self, negotiator: Character, target: Character, tick: int) -> Event:
-        negotiator.resources["influence"] = negotiator.resources.get("influence", 0) + 2
         return Event(
             tick=tick, type=EventType.NEGOTIATION,
             title=f"{negotiator.name} tries to negotiate with {target.name}",
@@ -515,16 +476,11 @@ class EventGenerator:
             participants=[negotiator.id, target.id],
             outcomes=[f"{negotiator.name} gains 2 influence from diplomatic effort"],
             importance=0.3,
+            resource_deltas=[_resource(negotiator, "influence", 2)],
         )
 
     def _resource_sharing(self, sharer: Character, receiver: Character, tick: int) -> Event:
         amount = min(5.0, sharer.resources.get("wealth", 0) * 0.15)
-        sharer.resources["wealth"] = max(0, sharer.resources.get("wealth", 0) - amount)
-        receiver.resources["wealth"] = receiver.resources.get("wealth", 0) + amount
-        sharer.resources["influence"] = sharer.resources.get("influence", 0) + 3
-        sharer.relationships[receiver.id] = _clamp(sharer.relationships.get(receiver.id, 0) + 0.2, -1, 1)
-        receiver.relationships[sharer.id] = _clamp(receiver.relationships.get(sharer.id, 0) + 0.25, -1, 1)
-
         return Event(
             tick=tick, type=EventType.RESOURCE_CHANGE,
             title=f"{sharer.name} shares with {receiver.name}",
@@ -535,11 +491,15 @@ class EventGenerator:
                 f"{sharer.name} gains 3 influence and goodwill",
             ],
             importance=0.4,
+            resource_deltas=[
+                _resource(sharer, "wealth", -amount),
+                _resource(receiver, "wealth", amount),
+                _resource(sharer, "influence", 3),
+            ],
+            relationship_deltas=[_relationship(sharer, receiver, 0.2), _relationship(receiver, sharer, 0.25)],
         )
 
     def _communication(self, a: Character, b: Character, tick: int) -> Event:
-        a.relationships[b.id] = _clamp(a.relationships.get(b.id, 0) + 0.1, -1, 1)
-        b.relationships[a.id] = _clamp(b.relationships.get(a.id, 0) + 0.05, -1, 1)
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"{a.name} and {b.name} converse",
@@ -547,6 +507,7 @@ class EventGenerator:
             participants=[a.id, b.id],
             outcomes=["Information exchanged", "Relationship slightly improved"],
             importance=0.25,
+            relationship_deltas=[_relationship(a, b, 0.1), _relationship(b, a, 0.05)],
         )
 
     def _competition(self, a: Character, b: Character, tick: int, state: SimulationState) -> Event:
@@ -564,17 +525,10 @@ class EventGenerator:
 
         prize = 8.0
         if a_score > b_score:
-            a.resources["wealth"] = a.resources.get("wealth", 0) + prize
-            a.resources["influence"] = a.resources.get("influence", 0) + 3
             winner, loser = a, b
         else:
-            b.resources["wealth"] = b.resources.get("wealth", 0) + prize
-            b.resources["influence"] = b.resources.get("influence", 0) + 3
             winner, loser = b, a
 
-        a.resources["energy"] = max(0, a.resources.get("energy", 0) - 8)
-        b.resources["energy"] = max(0, b.resources.get("energy", 0) - 8)
-
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"Competition: {a.name} vs {b.name}",
@@ -585,11 +539,13 @@ class EventGenerator:
                 f"{loser.name} loses the competition",
             ],
             importance=0.5,
+            resource_deltas=[
+                _resource(winner, "wealth", prize), _resource(winner, "influence", 3),
+                _resource(a, "energy", -8), _resource(b, "energy", -8),
+            ],
         )
 
     def _one_sided_competition(self, competitor: Character, target: Character, tick: int, state: SimulationState) -> Event:
-        competitor.resources["energy"] = max(0, competitor.resources.get("energy", 0) - 5)
-        competitor.resources["wealth"] = competitor.resources.get("wealth", 0) + 3
         return Event(
             tick=tick, type=EventType.INTERACTION,
             title=f"{competitor.name} competes near {target.name}",
@@ -597,6 +553,7 @@ class EventGenerator:
             participants=[competitor.id, target.id],
             outcomes=[f"{competitor.name} gains minor resources from competitive posturing"],
             importance=0.3,
+            resource_deltas=[_resource(competitor, "energy", -5), _resource(competitor, "wealth", 3)],
         )
 
     def _resolve_solo_action(self, char_id: str, action: Action, characters: dict[str, Character], state: SimulationState) -> Event | None:
@@ -611,12 +568,13 @@ class EventGenerator:
                 locs = state.environment.locations
                 if locs:
                     target_loc = rng.choice(locs)
-                    char.position["x"] += (target_loc["x"] - char.position["x"]) * 0.3
-                    char.position["y"] += (target_loc["y"] - char.position["y"]) * 0.3
-                char.resources["energy"] = max(0, char.resources.get("energy", 0) - 5)
+                    state.place(
+                        char_id,
+                        char.position["x"] + (target_loc["x"] - char.position["x"]) * 0.3,
+                        char.position["y"] + (target_loc["y"] - char.position["y"]) * 0.3,
+                    )
                 found = rng.random() < 0.4
                 if found:
-                    char.resources["wealth"] = char.resources.get("wealth", 0) + 3
                     return Event(
                         tick=tick, type=EventType.DECISION,
                         title=f"{char.name} explores and discovers something",
@@ -624,6 +582,7 @@ class EventGenerator:
                         participants=[char_id],
                         outcomes=[f"{char.name} gains 3 wealth from exploration"],
                         importance=0.4,
+                        resource_deltas=[_resource(char, "energy", -5), _resource(char, "wealth", 3)],
                     )
                 return Event(
                     tick=tick, type=EventType.DECISION,
@@ -632,11 +591,11 @@ class EventGenerator:
                     participants=[char_id],
                     outcomes=["Knowledge gained about the area"],
                     importance=0.2,
+                    resource_deltas=[_resource(char, "energy", -5)],
                 )
 
             case ActionType.REST:
                 recovery = 15 + char.traits.conscientiousness * 10
-                char.resources["energy"] = min(100, char.resources.get("energy", 0) + recovery)
                 return Event(
                     tick=tick, type=EventType.DECISION,
                     title=f"{char.name} rests",
@@ -644,15 +603,15 @@ class EventGenerator:
                     participants=[char_id],
                     outcomes=[f"{char.name} recovers {recovery:.0f} energy"],
                     importance=0.15,
+                    resource_deltas=[_resource(char, "energy", recovery, cap=100)],
                 )
 
             case ActionType.GATHER:
-                char.resources["energy"] = max(0, char.resources.get("energy", 0) - 8)
                 gathered = 5 + char.traits.conscientiousness * 5
-                char.resources["wealth"] = char.resources.get("wealth", 0) + gathered
                 env_drain = gathered * 0.3
                 for res in state.environment.resources:
                     state.environment.resources[res] = max(0, state.environment.resources[res] - env_drain / len(state.environment.resources))
+                state.touch(ENVIRONMENT, "resources")
                 return Event(
                     tick=tick, type=EventType.RESOURCE_CHANGE,
                     title=f"{char.name} gathers resources",
@@ -660,10 +619,10 @@ class EventGenerator:
                     participants=[char_id],
                     outcomes=[f"{char.name} gained {gathered:.0f} wealth"],
                     importance=0.3,
+                    resource_deltas=[_resource(char, "energy", -8), _resource(char, "wealth", gathered)],
                 )
 
             case ActionType.OBSERVE:
-                char.resources["energy"] = max(0, char.resources.get("energy", 0) - 2)
                 return Event(
                     tick=tick, type=EventType.DECISION,
                     title=f"{char.name} observes",
@@ -671,6 +630,7 @@ class EventGenerator:
                     participants=[char_id],
                     outcomes=["Information gathered through observation"],
                     importance=0.15,
+                    resource_deltas=[_resource(char, "energy", -2)],
                 )
 
             case _:
@@ -0,0 +1,339 @@
+import bisect
+import heapq
+import os
+from typing import Any, Generic, Iterable, Iterator, TypeVar, get_args
+from pydantic import BaseModel, GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+T = TypeVar("T")
+
+IMPORTANCE_BUCKETS = 10
+GLOBAL_SCOPE = "global"  # EventScope.GLOBAL; models imports this module, so it is compared by value
+
+
+class SegmentArchive:
+    """Append-only NDJSON segment holding records spilled out of a TickLog.
+
+    Only a per-tick (seq, byte offset) index is kept in memory; records are
+    parsed back from disk on demand.
+    """
+
+    def __init__(self, path: str, model: type[BaseModel]):
+        self.path = path
+        self.model = model
+        self.count = 0
+        self._size = 0
+        self._ticks: list[int] = []
+        self._seqs: list[int] = []
+        self._offsets: list[int] = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        open(path, "wb").close()
+
+    def write(self, first_seq: int, items: list):
+        lines: list[bytes] = []
+        offset = self._size
+        for i, item in enumerate(items):
+            if not self._ticks or item.tick != self._ticks[-1]:
+                self._ticks.append(item.tick)
+                self._seqs.append(first_seq + i)
+                self._offsets.append(offset)
+            line = item.model_dump_json().encode() + b"\n"
+            lines.append(line)
+            offset += len(line)
+        with open(self.path, "ab") as f:
+            f.writelines(lines)
+        self._size = offset
+        self.count = first_seq + len(items)
+
+    def seq_for_tick(self, tick: int) -> int:
+        i = bisect.bisect_left(self._ticks, tick)
+        return self._seqs[i] if i < len(self._seqs) else self.count
+
+    def read(self, start_seq: int, end_seq: int) -> Iterator[tuple[int, Any]]:
+        """Yield (seq, record) for archived records with start_seq <= seq < end_seq."""
+        end_seq = min(end_seq, self.count)
+        if start_seq >= end_seq:
+            return
+        block = max(bisect.bisect_right(self._seqs, start_seq) - 1, 0)
+        seq = self._seqs[block]
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[block])
+            for line in f:
+                if seq >= end_seq:
+                    break
+                if seq >= start_seq:
+                    yield seq, self.model.model_validate_json(line)
+                seq += 1
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class TickLog(Generic[T]):
+    """Append-only log of tick-stamped records with O(log n) tick range lookups.
+
+    Records must be appended in non-decreasing tick order. Every record gets a
+    sequence number (its position in the log) which doubles as a paging cursor.
+    Once an archive is attached, spill() moves old records to disk; iteration
+    and serialization only cover the in-memory window, while page() reads
+    through archived ranges transparently.
+    """
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._items: list[T] = []
+        self._ticks: list[int] = []
+        self._offset = 0
+        self.archive: SegmentArchive | None = None
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    @property
+    def total(self) -> int:
+        """Number of records ever appended, including archived ones."""
+        return self._offset + len(self._items)
+
+    def append(self, item: T):
+        if self._ticks and item.tick < self._ticks[-1]:
+            raise ValueError(f"{type(self).__name__} records must be appended in tick order")
+        seq = self.total
+        self._items.append(item)
+        self._ticks.append(item.tick)
+        self._index(seq, item)
+
+    def extend(self, items: Iterable[T]):
+        for item in items:
+            self.append(item)
+
+    def _index(self, seq: int, item: T):
+        pass
+
+    def _evicted(self):
+        pass
+
+    def to_list(self) -> list[T]:
+        return list(self._items)
+
+    def attach_archive(self, path: str, model: type[BaseModel]):
+        if self.archive is None:
+            self.archive = SegmentArchive(path, model)
+
+    def spill(self, before_tick: int) -> int:
+        """Move in-memory records older than before_tick to the archive. Returns how many moved."""
+        if self.archive is None:
+            return 0
+        count = bisect.bisect_left(self._ticks, before_tick)
+        if count == 0:
+            return 0
+        self.archive.write(self._offset, self._items[:count])
+        del self._items[:count]
+        del self._ticks[:count]
+        self._offset += count
+        self._evicted()
+        return count
+
+    def seq_for_tick(self, tick: int) -> int:
+        """Sequence number of the first record at or after tick."""
+        if self.archive is not None and self._offset and (not self._ticks or tick <= self._ticks[0]):
+            seq = self.archive.seq_for_tick(tick)
+            if seq < self._offset:
+                return seq
+        return self._offset + bisect.bisect_left(self._ticks, tick)
+
+    def _end_seq(self, until_tick: int | None) -> int:
+        if until_tick is None:
+            return self.total
+        if self._ticks and until_tick >= self._ticks[0]:
+            return self._offset + bisect.bisect_right(self._ticks, until_tick)
+        return self.seq_for_tick(until_tick + 1)
+
+    def range(self, since_tick: int = 0, until_tick: int | None = None) -> list[T]:
+        return self.page(since_tick, until_tick)[0]
+
+    def page(
+        self, since_tick: int = 0, until_tick: int | None = None,
+        cursor: int | None = None, limit: int | None = None,
+    ) -> tuple[list[T], int | None]:
+        """Return records in [since_tick, until_tick] starting at cursor, plus the next cursor if truncated."""
+        start = max(self.seq_for_tick(since_tick), cursor or 0)
+        end = self._end_seq(until_tick)
+        result: list[T] = []
+        next_cursor = self._scan_archive(start, end, limit, None, result)
+        if next_cursor is not None:
+            return result, next_cursor
+
+        lo = max(start, self._offset) - self._offset
+        hi = max(end - self._offset, lo)
+        if limit is not None and len(result) + hi - lo > limit:
+            hi = lo + limit - len(result)
+            result.extend(self._items[lo:hi])
+            return result, self._offset + hi
+        result.extend(self._items[lo:hi])
+        return result, None
+
+    def _scan_archive(self, start: int, end: int, limit: int | None, predicate, result: list[T]) -> int | None:
+        """Append archived records in [start, end) to result; returns the next cursor if limit was hit."""
+        if self.archive is None or start >= self._offset:
+            return None
+        for seq, item in self.archive.read(start, min(end, self._offset)):
+            if predicate is not None and not predicate(item):
+                continue
+            if limit is not None and len(result) == limit:
+                return seq
+            result.append(item)
+        return None
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        args = get_args(source_type)
+        item_type = args[0] if args else Any
+        list_schema = handler.generate_schema(list[item_type])
+        from_list = core_schema.no_info_after_validator_function(cls, list_schema)
+        return core_schema.json_or_python_schema(
+            json_schema=from_list,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_list]),
+            # A wrap serializer hands the list to list_schema with the caller's include/exclude still applied.
+            serialization=core_schema.wrap_serializer_function_ser_schema(
+                lambda log, serialize: serialize(log.to_list()), schema=list_schema,
+            ),
+        )
+
+
+class EventStore(TickLog[T]):
+    """Event log indexed by tick, participant, type and importance.
+
+    Global-scope events are kept on their own posting list and count as
+    involving every participant, so they are never expanded per character.
+    """
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._by_participant: dict[str, list[int]] = {}
+        self._global: list[int] = []
+        self._by_type: dict[Any, list[int]] = {}
+        self._by_importance: list[list[int]] = [[] for _ in range(IMPORTANCE_BUCKETS)]
+        self._compacted_offset = 0
+        super().__init__(items)
+
+    def _index(self, seq: int, event: T):
+        if event.scope == GLOBAL_SCOPE:
+            self._global.append(seq)
+        else:
+            for pid in event.participants:
+                self._by_participant.setdefault(pid, []).append(seq)
+        self._by_type.setdefault(event.type, []).append(seq)
+        self._by_importance[_importance_bucket(event.importance)].append(seq)
+
+    def _evicted(self):
+        # Drop archived seqs from the posting lists once they outweigh the live window (amortized O(1)).
+        if self._offset - self._compacted_offset <= len(self._items):
+            return
+        for index in (self._by_participant, self._by_type):
+            for key in list(index):
+                postings = index[key]
+                del postings[:bisect.bisect_left(postings, self._offset)]
+                if not postings:
+                    del index[key]
+        for postings in (*self._by_importance, self._global):
+            del postings[:bisect.bisect_left(postings, self._offset)]
+        self._compacted_offset = self._offset
+
+    def _participant_postings(self, participant: str) -> list[int]:
+        own = self._by_participant.get(participant, [])
+        if not self._global:
+            return own
+        if not own:
+            return self._global
+        return list(heapq.merge(own, self._global))
+
+    def recent_for(self, participant: str, since_tick: int) -> list[T]:
+        """Events involving participant at or after since_tick, oldest first. O(k) in the result size."""
+        result: list[T] = []
+        exhausted = True
+        for postings in (self._by_participant.get(participant, []), self._global):
+            for seq in reversed(postings):
+                if seq < self._offset:
+                    break
+                event = self._items[seq - self._offset]
+                if event.tick < since_tick:
+                    exhausted = False
+                    break
+                result.append((seq, event))
+        result.sort(key=lambda pair: pair[0])
+        result = [event for _, event in result]
+
+        if exhausted and self.archive is not None and self._offset and (not self._ticks or since_tick < self._ticks[0]):
+            archived: list[T] = []
+            self._scan_archive(
+                self.archive.seq_for_tick(since_tick), self._offset, None,
+                lambda e: e.involves(participant), archived,
+            )
+            result = archived + result
+        return result
+
+    def query(
+        self,
+        since_tick: int = 0,
+        until_tick: int | None = None,
+        event_type: Any = None,
+        participant: str | None = None,
+        min_importance: float | None = None,
+        cursor: int | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[T], int | None]:
+        """Filter events, walking the most selective index. Returns (events, next_cursor)."""
+        def matches(event) -> bool:
+            if participant is not None and not event.involves(participant):
+                return False
+            if event_type is not None and event.type != event_type:
+                return False
+            if min_importance is not None and event.importance < min_importance:
+                return False
+            return True
+
+        if event_type is None and participant is None and min_importance is None:
+            return self.page(since_tick, until_tick, cursor, limit)
+
+        start = max(self.seq_for_tick(since_tick), cursor or 0)
+        end = self._end_seq(until_tick)
+        result: list[T] = []
+        # Archived ranges have no on-disk index, so they are filtered while streaming.
+        next_cursor = self._scan_archive(start, end, limit, matches, result)
+        if next_cursor is not None:
+            return result, next_cursor
+
+        postings: list[int] | None = None
+        if participant is not None:
+            postings = self._participant_postings(participant)
+        if event_type is not None:
+            by_type = self._by_type.get(event_type, [])
+            if postings is None or len(by_type) < len(postings):
+                postings = by_type
+        if min_importance is not None:
+            buckets = self._by_importance[_importance_bucket(min_importance):]
+            if postings is None or sum(len(b) for b in buckets) < len(postings):
+                postings = list(heapq.merge(*buckets))
+
+        # Seqs below _offset may linger in the postings until compaction; _scan_archive covered them.
+        for i in range(bisect.bisect_left(postings, max(start, self._offset)), len(postings)):
+            seq = postings[i]
+            if seq >= end:
+                break
+            event = self._items[seq - self._offset]
+            if not matches(event):
+                continue
+            if limit is not None and len(result) == limit:
+                return result, seq
+            result.append(event)
+        return result, None
+
+
+def _importance_bucket(importance: float) -> int:
+    return min(int(importance * IMPORTANCE_BUCKETS), IMPORTANCE_BUCKETS - 1)
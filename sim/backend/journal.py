@@ -0,0 +1,62 @@
+ALL_FIELDS = "*"
+ENVIRONMENT = "environment"
+ALLIANCES = "alliances"
+
+
+class ChangeJournal:
+    """Tick at which each field of each entity was last mutated, for since-tick delta views.
+
+    Fields are top-level model field names; nested fields use dotted paths
+    ("memory.short_term"). ALL_FIELDS marks an entity as wholly new.
+    Removals older than the pruned horizon are forgotten, so deltas since an
+    earlier tick cannot be answered from the journal (see covers).
+    """
+
+    def __init__(self):
+        self._fields: dict[str, dict[str, int]] = {}
+        self._removed: dict[str, int] = {}  # in removal order, so ticks never decrease
+        self._horizon = 0
+
+    def mark(self, entity_id: str, tick: int, *fields: str):
+        entry = self._fields.setdefault(entity_id, {})
+        for field in fields:
+            entry[field] = tick
+
+    def forget(self, entity_id: str, tick: int):
+        """Record that an entity was removed; its field history is dropped."""
+        self._fields.pop(entity_id, None)
+        self._removed[entity_id] = tick
+
+    def changed_since(self, entity_id: str, since_tick: int) -> list[str]:
+        entry = self._fields.get(entity_id)
+        if not entry:
+            return []
+        return [field for field, tick in entry.items() if tick >= since_tick]
+
+    def removed_since(self, since_tick: int) -> list[str]:
+        return [entity_id for entity_id, tick in self._removed.items() if tick >= since_tick]
+
+    def covers(self, since_tick: int) -> bool:
+        return since_tick >= self._horizon
+
+    def prune(self, before_tick: int):
+        """Forget removals before before_tick; deltas since an earlier tick are no longer covered."""
+        removed = self._removed
+        while removed:
+            entity_id = next(iter(removed))
+            if removed[entity_id] >= before_tick:
+                break
+            del removed[entity_id]
+        self._horizon = max(self._horizon, before_tick)
+
+
+def include_spec(fields: list[str]) -> dict:
+    """Turn dotted field paths into a pydantic include mapping."""
+    spec: dict = {}
+    for path in fields:
+        head, _, rest = path.partition(".")
+        if not rest:
+            spec[head] = True
+        elif spec.get(head) is not True:
+            spec.setdefault(head, {})[rest] = True
+    return spec
@@ -1,13 +1,32 @@
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import get_args, get_origin
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from models import (
     SimulationState, SimulationConfig, Character, CharacterCreate,
-    Event, Memory, ChatMessage,
+    Event, EventType, Memory, ChatMessage, SimulationDelta, SimulationSummary, Coalition,
 )
-from engine import SimulationEngine
+from engine import SimulationEngine, MAX_ADVANCE_TICKS
+from eventstore import TickLog
+from service import SimulationService, ServiceError, StepResponse, AdvanceResponse
+from shards import ShardPool
+from runner import SimulationRunner, DEFAULT_TICK_RATE
+from stream import TickStreamHub
 
-app = FastAPI(title="Multi-Agent Simulation Platform")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service.start()
+    yield
+    await runner.shutdown()
+    service.close()
+
+
+app = FastAPI(title="Multi-Agent Simulation Platform", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,7 +36,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-engine = SimulationEngine()
+# SIM_SHARDS=N runs simulations in N worker processes instead of in this one.
+SHARDS = int(os.environ.get("SIM_SHARDS", "0"))
+# SIM_DECIDE_WORKERS=N fans each large tick's decisions out over N processes (unsharded mode only).
+DECIDE_WORKERS = int(os.environ.get("SIM_DECIDE_WORKERS", "0"))
+service: SimulationService | ShardPool = (
+    ShardPool(SHARDS) if SHARDS > 0 else SimulationService(SimulationEngine(decide_workers=DECIDE_WORKERS))
+)
+runner = SimulationRunner(service)
+hub = TickStreamHub(service)
+runner.listeners.append(hub.publish_status)
+
+
+@app.exception_handler(ServiceError)
+async def service_error_handler(request: Request, exc: ServiceError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 
 class CreateSimulationRequest(BaseModel):
@@ -25,23 +58,64 @@ class CreateSimulationRequest(BaseModel):
     information_symmetry: float | None = None
     resource_scarcity: float | None = None
     max_ticks: int | None = None
-
-
-class StepResponse(BaseModel):
-    events: list[Event]
-    state: SimulationState
-    chat_messages: list[ChatMessage]
-
-
-@app.get("/api/simulations", response_model=list[SimulationState])
-def list_simulations():
-    return list(engine.simulations.values())
+    history_window: int | None = None
+    memory_budget: int | None = None
+    memory_compaction: bool | None = None
+
+
+class RunStatus(BaseModel):
+    sim_id: str
+    running: bool
+    tick: int
+    tick_rate: float
+
+
+def _projection(model: type[BaseModel], paths: list[str]) -> dict | None:
+    """Turn "field" / "field.subfield" paths into a pydantic include/exclude mapping."""
+    if not paths:
+        return None
+    spec: dict = {}
+    for path in paths:
+        head, _, rest = path.partition(".")
+        field = model.model_fields.get(head)
+        if field is None or "." in rest:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {path}")
+        if not rest:
+            spec[head] = True
+            continue
+        origin = get_origin(field.annotation)
+        # Subfields of a collection of models (characters.memory, events.title) apply to every item.
+        collection = origin is dict or (isinstance(origin, type) and issubclass(origin, TickLog))
+        item = get_args(field.annotation)[-1] if collection else field.annotation
+        if not (isinstance(item, type) and issubclass(item, BaseModel)) or rest not in item.model_fields:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {path}")
+        if spec.get(head) is not True:
+            nested = spec.setdefault(head, {})
+            if collection:
+                nested = nested.setdefault("__all__", {})
+            nested[rest] = True
+    return spec
+
+
+@app.get("/api/simulations", response_model=list[SimulationSummary])
+def list_simulations(
+    response: Response,
+    cursor: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    summaries = service.list_summaries()
+    if cursor + limit < len(summaries):
+        response.headers["X-Next-Cursor"] = str(cursor + limit)
+    return summaries[cursor:cursor + limit]
 
 
 @app.post("/api/simulations", response_model=SimulationState)
 def create_simulation(req: CreateSimulationRequest | None = None):
     config = None
-    if req and any(v is not None for v in [req.randomness, req.information_symmetry, req.resource_scarcity, req.max_ticks]):
+    if req and any(v is not None for v in [
+        req.randomness, req.information_symmetry, req.resource_scarcity, req.max_ticks, req.history_window,
+        req.memory_budget, req.memory_compaction,
+    ]):
         kwargs = {}
         if req.randomness is not None:
             kwargs["randomness"] = req.randomness
@@ -51,106 +125,216 @@ def create_simulation(req: CreateSimulationRequest | None = None):
             kwargs["resource_scarcity"] = req.resource_scarcity
         if req.max_ticks is not None:
             kwargs["max_ticks"] = req.max_ticks
+        if req.history_window is not None:
+            kwargs["history_window"] = req.history_window
+        if req.memory_budget is not None:
+            kwargs["memory_budget"] = req.memory_budget
+        if req.memory_compaction is not None:
+            kwargs["memory_compaction"] = req.memory_compaction
         config = SimulationConfig(**kwargs)
-    return engine.create_simulation(config)
+    _, body = service.create_simulation(config)
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/api/simulations/{sim_id}", response_model=SimulationState | SimulationDelta)
+def get_simulation(
+    sim_id: str,
+    request: Request,
+    since_tick: int | None = Query(default=None, ge=0),
+    fields: list[str] = Query(default=[]),
+    exclude: list[str] = Query(default=[]),
+):
+    if not service.has(sim_id):
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    if since_tick is not None and (fields or exclude):
+        raise HTTPException(status_code=400, detail="fields and exclude apply to the full state only")
+    if since_tick is None:
+        view = f"full:{','.join(sorted(fields))}:{','.join(sorted(exclude))}"
+    else:
+        view = f"since:{since_tick}"
+    etag, body = service.get_simulation(
+        sim_id, view, _projection(SimulationState, fields), _projection(SimulationState, exclude),
+        since_tick, request.headers.get("if-none-match"),
+    )
+    if body is None:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
-@app.get("/api/simulations/{sim_id}", response_model=SimulationState)
-def get_simulation(sim_id: str):
-    if sim_id not in engine.simulations:
+@app.post("/api/simulations/{sim_id}/step", response_model=StepResponse)
+def step_simulation(sim_id: str, since_tick: int | None = Query(default=None, ge=0)):
+    if not service.has(sim_id):
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    if runner.is_running(sim_id):
+        raise HTTPException(status_code=409, detail="Simulation is running")
+    return Response(content=service.step(sim_id, since_tick), media_type="application/json")
+
+
+@app.post("/api/simulations/{sim_id}/advance", response_model=AdvanceResponse)
+def advance_simulation(
+    sim_id: str,
+    ticks: int | None = Query(default=None, ge=1, le=MAX_ADVANCE_TICKS),
+    until_tick: int | None = Query(default=None, ge=0),
+    stop_on: list[EventType] = Query(default=[]),
+    include_state: bool = False,
+):
+    if not service.has(sim_id):
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    if ticks is None and until_tick is None:
+        raise HTTPException(status_code=400, detail="Provide ticks or until_tick")
+    if runner.is_running(sim_id):
+        raise HTTPException(status_code=409, detail="Simulation is running")
+    body = service.advance(sim_id, ticks, until_tick, set(stop_on), include_state)
+    return Response(content=body, media_type="application/json")
+
+
+async def _run_status(sim_id: str) -> RunStatus:
+    return RunStatus(
+        sim_id=sim_id,
+        running=runner.is_running(sim_id),
+        tick=await asyncio.to_thread(service.tick, sim_id),
+        tick_rate=runner.tick_rates.get(sim_id, DEFAULT_TICK_RATE),
+    )
+
+
+@app.post("/api/simulations/{sim_id}/start", response_model=RunStatus)
+async def start_simulation(sim_id: str, tick_rate: float | None = Query(default=None, gt=0, le=100)):
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    return engine.get_state(sim_id)
+    runner.start(sim_id, tick_rate)
+    return await _run_status(sim_id)
 
 
-@app.post("/api/simulations/{sim_id}/step", response_model=StepResponse)
-def step_simulation(sim_id: str):
-    if sim_id not in engine.simulations:
+@app.post("/api/simulations/{sim_id}/pause", response_model=RunStatus)
+async def pause_simulation(sim_id: str):
+    if not service.has(sim_id):
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    runner.pause(sim_id)
+    return await _run_status(sim_id)
+
+
+@app.post("/api/simulations/{sim_id}/resume", response_model=RunStatus)
+async def resume_simulation(sim_id: str):
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    events, chat_messages = engine.step(sim_id)
-    return StepResponse(events=events, state=engine.get_state(sim_id), chat_messages=chat_messages)
+    runner.resume(sim_id)
+    return await _run_status(sim_id)
 
 
 @app.patch("/api/simulations/{sim_id}/config", response_model=SimulationState)
 def update_config(sim_id: str, config: SimulationConfig):
-    if sim_id not in engine.simulations:
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    engine.update_config(sim_id, config)
-    return engine.get_state(sim_id)
+    return Response(content=service.update_config(sim_id, config), media_type="application/json")
 
 
 @app.delete("/api/simulations/{sim_id}")
-def delete_simulation(sim_id: str):
-    if sim_id not in engine.simulations:
+async def delete_simulation(sim_id: str):
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    engine.delete_simulation(sim_id)
+    runner.forget(sim_id)
+    await asyncio.to_thread(service.delete_simulation, sim_id)
     return {"status": "deleted"}
 
 
 @app.post("/api/simulations/{sim_id}/characters", response_model=Character)
 def add_character(sim_id: str, char_create: CharacterCreate):
-    if sim_id not in engine.simulations:
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    return engine.add_character(sim_id, char_create)
+    return Response(content=service.add_character(sim_id, char_create), media_type="application/json")
 
 
 @app.get("/api/simulations/{sim_id}/characters/{char_id}", response_model=Character)
-def get_character(sim_id: str, char_id: str):
-    if sim_id not in engine.simulations:
+def get_character(
+    sim_id: str,
+    char_id: str,
+    fields: list[str] = Query(default=[]),
+    exclude: list[str] = Query(default=[]),
+):
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    sim = engine.get_state(sim_id)
-    if char_id not in sim.characters:
-        raise HTTPException(status_code=404, detail="Character not found")
-    return sim.characters[char_id]
+    body = service.get_character(sim_id, char_id, _projection(Character, fields), _projection(Character, exclude))
+    return Response(content=body, media_type="application/json")
 
 
 @app.delete("/api/simulations/{sim_id}/characters/{char_id}")
 def remove_character(sim_id: str, char_id: str):
-    if sim_id not in engine.simulations:
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    sim = engine.get_state(sim_id)
-    if char_id not in sim.characters:
-        raise HTTPException(status_code=404, detail="Character not found")
-    engine.remove_character(sim_id, char_id)
+    service.remove_character(sim_id, char_id)
     return {"status": "removed"}
 
 
 @app.get("/api/simulations/{sim_id}/characters/{char_id}/memory", response_model=Memory)
 def get_character_memory(sim_id: str, char_id: str):
-    if sim_id not in engine.simulations:
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    sim = engine.get_state(sim_id)
-    if char_id not in sim.characters:
-        raise HTTPException(status_code=404, detail="Character not found")
-    return sim.characters[char_id].memory
+    return Response(content=service.get_memory(sim_id, char_id), media_type="application/json")
 
 
 @app.get("/api/simulations/{sim_id}/characters/{char_id}/reasoning")
 def get_character_reasoning(sim_id: str, char_id: str):
-    if sim_id not in engine.simulations:
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    sim = engine.get_state(sim_id)
-    if char_id not in sim.characters:
-        raise HTTPException(status_code=404, detail="Character not found")
-    char = sim.characters[char_id]
-    return {
-        "character_id": char_id,
-        "name": char.name,
-        "last_action": char.last_action,
-        "last_reasoning": char.last_reasoning,
-    }
+    return service.get_reasoning(sim_id, char_id)
 
 
 @app.get("/api/simulations/{sim_id}/events", response_model=list[Event])
-def get_events(sim_id: str, since_tick: int = Query(default=0, ge=0)):
-    if sim_id not in engine.simulations:
+def get_events(
+    sim_id: str,
+    since_tick: int = Query(default=0, ge=0),
+    until_tick: int | None = Query(default=None, ge=0),
+    event_type: EventType | None = Query(default=None, alias="type"),
+    participant: str | None = None,
+    min_importance: float | None = Query(default=None, ge=0.0, le=1.0),
+    cursor: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+):
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    sim = engine.get_state(sim_id)
-    return [e for e in sim.events if e.tick >= since_tick]
+    body, next_cursor = service.get_events(
+        sim_id, since_tick, until_tick, event_type, participant, min_importance, cursor, limit,
+    )
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/simulations/{sim_id}/chat", response_model=list[ChatMessage])
-def get_chat(sim_id: str, since_tick: int = Query(default=0, ge=0)):
-    if sim_id not in engine.simulations:
+def get_chat(
+    sim_id: str,
+    since_tick: int = Query(default=0, ge=0),
+    until_tick: int | None = Query(default=None, ge=0),
+    cursor: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+):
+    if not service.has(sim_id):
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    body, next_cursor = service.get_chat(sim_id, since_tick, until_tick, cursor, limit)
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/simulations/{sim_id}/coalitions", response_model=list[Coalition])
+def get_coalitions(sim_id: str, min_size: int = Query(default=3, ge=2)):
+    if not service.has(sim_id):
         raise HTTPException(status_code=404, detail="Simulation not found")
-    sim = engine.get_state(sim_id)
-    return [m for m in sim.chat_log if m.tick >= since_tick]
+    return Response(content=service.get_coalitions(sim_id, min_size), media_type="application/json")
+
+
+@app.websocket("/ws/simulations/{sim_id}")
+async def simulation_stream(websocket: WebSocket, sim_id: str):
+    if not service.has(sim_id):
+        await websocket.close(code=4404)
+        return
+    await hub.serve(websocket, sim_id)
+
+
+@app.get("/api/shards")
+def list_shards():
+    return [{"shard": index, "simulations": load} for index, load in enumerate(service.shard_loads())]
+
+
+@app.post("/api/shards/rebalance")
+def rebalance_shards():
+    moves = service.rebalance()
+    return {"moved": [{"sim_id": sim_id, "from": source, "to": target} for sim_id, source, target in moves]}
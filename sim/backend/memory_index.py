@@ -0,0 +1,154 @@
+import heapq
+from collections import Counter
+from typing import Any
+
+BETRAYAL_WORDS = ("betray", "attack", "stole", "lied", "backstab")
+COOPERATION_WORDS = ("cooperat", "shared", "helped", "ally", "alliance")
+
+# Retention priority per tick of age: a memory 100 ticks older needs +1.0 importance to outlive a newer one.
+MEMORY_RECENCY_WEIGHT = 0.01
+
+
+def tokenize(text: str) -> frozenset[str]:
+    return frozenset(text.lower().split())
+
+
+def classify(content: str) -> tuple[bool, bool]:
+    """(betrayal, cooperation) flags for a memory's content."""
+    lowered = content.lower()
+    return any(w in lowered for w in BETRAYAL_WORDS), any(w in lowered for w in COOPERATION_WORDS)
+
+
+def _tallies(entry: Any) -> tuple[int, int]:
+    if entry.summary is not None:
+        return entry.summary.betrayals, entry.summary.cooperations
+    betrayal, cooperation = classify(entry.content)
+    return int(betrayal), int(cooperation)
+
+
+def retention_priority(entry: Any) -> float:
+    return entry.importance + MEMORY_RECENCY_WEIGHT * entry.tick
+
+
+class MemoryIndex:
+    """Token -> memory inverted index over one character's short- and long-term memories.
+
+    Also keeps per-character betrayal/cooperation tallies over the indexed
+    memories, adjusted as entries are added and removed, and a min-heap of
+    long-term memories by retention priority for budget eviction.
+    """
+
+    def __init__(self):
+        self.entries: dict[str, Any] = {}
+        self._tokens: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._long_term_seq: dict[str, int] = {}
+        self._next_seq = 0
+        self._retention: list[tuple[float, int, str]] = []
+        self._flags: dict[str, tuple[int, int]] = {}
+        self.betrayals: Counter[str] = Counter()
+        self.cooperations: Counter[str] = Counter()
+        self._changed: dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: Any):
+        if entry.id in self.entries:
+            return
+        tokens = tokenize(entry.content)
+        self.entries[entry.id] = entry
+        self._tokens[entry.id] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(entry.id)
+        flags = _tallies(entry)
+        self._flags[entry.id] = flags
+        self._tally(entry, flags, 1)
+
+    def promote(self, entry: Any):
+        """Record that entry moved to long-term memory (long-term recall order is promotion order)."""
+        self.add(entry)
+        self._long_term_seq[entry.id] = self._next_seq
+        heapq.heappush(self._retention, (retention_priority(entry), self._next_seq, entry.id))
+        self._next_seq += 1
+
+    def remove(self, entry: Any):
+        tokens = self._tokens.pop(entry.id, None)
+        if tokens is None:
+            return
+        del self.entries[entry.id]
+        self._long_term_seq.pop(entry.id, None)
+        self._tally(entry, self._flags.pop(entry.id), -1)
+        for token in tokens:
+            postings = self._postings[token]
+            postings.discard(entry.id)
+            if not postings:
+                del self._postings[token]
+        if len(self._retention) > 2 * len(self._long_term_seq) + 16:
+            # Drop heap slots of entries removed other than by eviction.
+            self._retention = [r for r in self._retention if self._long_term_seq.get(r[2]) == r[1]]
+            heapq.heapify(self._retention)
+
+    @property
+    def long_term_count(self) -> int:
+        return len(self._long_term_seq)
+
+    def evict_long_term(self) -> Any | None:
+        """Remove and return the long-term memory with the lowest importance/recency priority."""
+        while self._retention:
+            _, seq, mem_id = heapq.heappop(self._retention)
+            if self._long_term_seq.get(mem_id) == seq:
+                entry = self.entries[mem_id]
+                self.remove(entry)
+                return entry
+        return None
+
+    def _tally(self, entry: Any, flags: tuple[int, int], delta: int):
+        betrayals, cooperations = flags
+        if not (betrayals or cooperations):
+            return
+        for char_id in entry.related_characters:
+            if betrayals:
+                self.betrayals[char_id] += betrayals * delta
+            if cooperations:
+                self.cooperations[char_id] += cooperations * delta
+            self._changed[char_id] = None
+
+    def take_changed(self) -> list[str]:
+        """Character ids whose tallies changed since the last call."""
+        changed = list(self._changed)
+        self._changed.clear()
+        return changed
+
+    def search(self, keywords: set[str], short_term: list, limit: int = 10) -> list:
+        """Top entries by keyword overlap and importance, ties kept in short-term-then-long-term order."""
+        overlaps: Counter[str] = Counter()
+        for keyword in keywords:
+            postings = self._postings.get(keyword)
+            if postings:
+                overlaps.update(postings)
+        if not overlaps:
+            return []
+
+        position = self._positions(short_term)
+
+        def rank(mem_id: str) -> tuple[float, int]:
+            return overlaps[mem_id] * 0.3 + self.entries[mem_id].importance * 0.7, -position(mem_id)
+
+        return [self.entries[mem_id] for mem_id in heapq.nlargest(limit, overlaps, key=rank)]
+
+    def recall_rows(self, short_term: list) -> list[tuple[Any, frozenset[str], int]]:
+        """(entry, tokens, position) for every indexed entry; search breaks score ties by lower position."""
+        position = self._positions(short_term)
+        return [(entry, self._tokens[mem_id], position(mem_id)) for mem_id, entry in self.entries.items()]
+
+    def _positions(self, short_term: list):
+        """Recall order: short-term entries as listed, then long-term ones in promotion order."""
+        short_positions = {m.id: i for i, m in enumerate(short_term)}
+        long_base = len(short_term)
+
+        def position(mem_id: str) -> int:
+            found = short_positions.get(mem_id)
+            return long_base + self._long_term_seq.get(mem_id, 0) if found is None else found
+
+        return position
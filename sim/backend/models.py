@@ -1,8 +1,15 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer
+from typing import Any, Optional
 from enum import Enum
 import uuid
+import numpy as np
 import time
+from spatial import SpatialGrid
+from columns import CharacterColumns
+from coalitions import AllianceGraph
+from eventstore import EventStore, TickLog
+from memory_index import MemoryIndex
+from journal import ChangeJournal, ALL_FIELDS, ENVIRONMENT, ALLIANCES, include_spec
 
 
 class PersonalityTraits(BaseModel):
@@ -23,6 +30,12 @@ class EmotionalState(BaseModel):
     sadness: float = Field(default=0.0, ge=-1.0, le=1.0)
 
 
+class MemorySummary(BaseModel):
+    count: int = Field(default=1, ge=1)
+    betrayals: int = 0
+    cooperations: int = 0
+
+
 class MemoryEntry(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     tick: int
@@ -30,6 +43,7 @@ class MemoryEntry(BaseModel):
     importance: float = Field(default=0.5, ge=0.0, le=1.0)
     related_characters: list[str] = []
     emotional_context: EmotionalState = Field(default_factory=EmotionalState)
+    summary: MemorySummary | None = None  # set on entries compacted from several memories
 
 
 class Memory(BaseModel):
@@ -37,6 +51,18 @@ class Memory(BaseModel):
     long_term: list[MemoryEntry] = []
     beliefs: dict[str, str] = {}
 
+    _index: MemoryIndex = PrivateAttr(default_factory=MemoryIndex)
+
+    def model_post_init(self, __context) -> None:
+        for entry in self.short_term:
+            self._index.add(entry)
+        for entry in self.long_term:
+            self._index.promote(entry)
+
+    @property
+    def index(self) -> MemoryIndex:
+        return self._index
+
 
 class ActionType(str, Enum):
     COOPERATE = "cooperate"
@@ -88,6 +114,29 @@ class Character(BaseModel):
     position: dict[str, float] = Field(default_factory=lambda: {"x": 0.0, "y": 0.0})
     house_id: str | None = None
 
+    # While the character belongs to a simulation, position, emotional_state and resources are
+    # views of its CharacterColumns row (see CharacterColumns.load); plain values are built here.
+    @field_serializer("emotional_state", mode="wrap")
+    def _serialize_emotional_state(self, value, handler):
+        return handler(self.emotional_snapshot() if not isinstance(value, EmotionalState) else value)
+
+    @field_serializer("resources", "position", mode="wrap")
+    def _serialize_row(self, value, handler):
+        return handler(value if isinstance(value, dict) else dict(value))
+
+    def emotional_snapshot(self) -> EmotionalState:
+        """A standalone copy of the character's current emotions."""
+        state = self.emotional_state
+        if isinstance(state, EmotionalState):
+            return state.model_copy()
+        return EmotionalState.model_construct(**state.as_dict())
+
+    def unbind(self):
+        """Give a character leaving its simulation plain values in place of its row views."""
+        self.emotional_state = self.emotional_snapshot()
+        self.resources = dict(self.resources)
+        self.position = dict(self.position)
+
 
 class CharacterCreate(BaseModel):
     name: str
@@ -110,15 +159,46 @@ class EventType(str, Enum):
     EMOTIONAL_SHIFT = "emotional_shift"
 
 
+class EventScope(str, Enum):
+    LOCAL = "local"
+    GLOBAL = "global"
+
+
+class ResourceDelta(BaseModel):
+    character_id: str
+    resource: str
+    amount: float
+    cap: float | None = None  # upper bound after applying; resources never drop below 0
+
+
+class RelationshipDelta(BaseModel):
+    character_id: str
+    target_id: str
+    amount: float
+
+
+class AllianceDelta(BaseModel):
+    character_id: str
+    target_id: str
+    allied: bool  # False breaks the alliance
+
+
 class Event(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     tick: int
     type: EventType
     title: str
     description: str
-    participants: list[str] = []
+    participants: list[str] = []  # for GLOBAL events, only characters singled out beyond "everyone"
+    scope: EventScope = EventScope.LOCAL
     outcomes: list[str] = []
     importance: float = Field(default=0.5, ge=0.0, le=1.0)
+    resource_deltas: list[ResourceDelta] = []
+    relationship_deltas: list[RelationshipDelta] = []
+    alliance_deltas: list[AllianceDelta] = []
+
+    def involves(self, char_id: str) -> bool:
+        return self.scope == EventScope.GLOBAL or char_id in self.participants
 
 
 class Environment(BaseModel):
@@ -145,6 +225,9 @@ class SimulationConfig(BaseModel):
     information_symmetry: float = Field(default=0.5, ge=0.0, le=1.0)
     resource_scarcity: float = Field(default=0.3, ge=0.0, le=1.0)
     max_ticks: int = 1000
+    history_window: int | None = Field(default=None, ge=1)  # ticks of events/chat kept in memory; None keeps all
+    memory_budget: int | None = Field(default=200, ge=1)  # long-term memories kept per character; None keeps all
+    memory_compaction: bool = False  # merge low-importance memories about one counterpart before evicting
 
 
 class ChatMessage(BaseModel):
@@ -160,13 +243,186 @@ class ChatMessage(BaseModel):
     action_context: str = ""
 
 
+class StopReason(str, Enum):
+    TICKS = "ticks"
+    UNTIL_TICK = "until_tick"
+    MAX_TICKS = "max_ticks"
+    EVENT = "event"
+
+
+class AdvanceSummary(BaseModel):
+    start_tick: int
+    tick: int
+    ticks_run: int = 0
+    stop_reason: StopReason = StopReason.TICKS
+    event_count: int = 0
+    chat_count: int = 0
+    event_counts: dict[EventType, int] = {}
+    stop_event: Event | None = None
+
+
+class SimulationSummary(BaseModel):
+    id: str
+    tick: int
+    population: int
+    config: SimulationConfig
+    running: bool
+    created_at: float
+
+
+class Coalition(BaseModel):
+    members: list[str]
+    names: list[str]
+    formed_tick: int | None = None  # tick it was announced; None while below the reporting size
+
+
+class Alliances(BaseModel):
+    """Standing alliances as serialized; a loaded SimulationState rebuilds its AllianceGraph from them."""
+    allies: dict[str, list[str]] = {}  # character -> allies, characters in the order they first allied
+    formed: dict[str, int] = {}  # oldest member of each reported coalition -> tick it was first reported
+
+
+class SimulationDelta(BaseModel):
+    id: str
+    since_tick: int
+    tick: int
+    running: bool
+    config: SimulationConfig
+    characters: dict[str, dict[str, Any]] = {}  # changed fields only; new characters in full
+    removed_characters: list[str] = []
+    environment: dict[str, Any] = {}  # changed fields only
+    alliances: Alliances | None = None  # only when they changed (always when full)
+    full: bool = False  # since_tick predates the change journal: every character and the environment in full
+
+
 class SimulationState(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     tick: int = 0
     characters: dict[str, Character] = {}
     environment: Environment = Field(default_factory=Environment)
-    events: list[Event] = []
-    chat_log: list[ChatMessage] = []
+    events: EventStore[Event] = Field(default_factory=EventStore)
+    chat_log: TickLog[ChatMessage] = Field(default_factory=TickLog)
     config: SimulationConfig = Field(default_factory=SimulationConfig)
     running: bool = False
     created_at: float = Field(default_factory=time.time)
+    # Written from the alliance graph when serialized; only read back when a state is loaded.
+    alliances: Alliances = Field(default_factory=Alliances)
+
+    _spatial: SpatialGrid = PrivateAttr(default_factory=SpatialGrid)
+    _journal: ChangeJournal = PrivateAttr(default_factory=ChangeJournal)
+    _columns: CharacterColumns = PrivateAttr(default_factory=CharacterColumns)
+    _coalitions: AllianceGraph = PrivateAttr(default_factory=AllianceGraph)
+
+    def model_post_init(self, __context) -> None:
+        for char in self.characters.values():
+            self._spatial.insert(char.id, char.position["x"], char.position["y"])
+            self._columns.add(char)
+            self._journal.mark(char.id, self.tick, ALL_FIELDS)
+        for char in self.characters.values():
+            self._columns.load_relationships(char)
+        allies = {
+            char_id: others for char_id, others in self.alliances.allies.items() if char_id in self.characters
+        }
+        self._coalitions = AllianceGraph.restore(allies, self.alliances.formed)
+        self.alliances = Alliances()
+        self._journal.mark(ENVIRONMENT, self.tick, ALL_FIELDS)
+        self._journal.mark(ALLIANCES, self.tick, ALL_FIELDS)
+        # A loaded state carries no removal history, so earlier deltas fall back to full.
+        self._journal.prune(self.tick)
+
+    @field_serializer("alliances", mode="wrap")
+    def _serialize_alliances(self, value, handler):
+        return handler(self._alliances())
+
+    def _alliances(self) -> Alliances:
+        allies, formed = self._coalitions.export()
+        return Alliances(allies=allies, formed=formed)
+
+    @property
+    def spatial(self) -> SpatialGrid:
+        return self._spatial
+
+    @property
+    def journal(self) -> ChangeJournal:
+        return self._journal
+
+    @property
+    def columns(self) -> CharacterColumns:
+        return self._columns
+
+    @property
+    def coalitions(self) -> AllianceGraph:
+        return self._coalitions
+
+    def summary(self) -> SimulationSummary:
+        return SimulationSummary(
+            id=self.id,
+            tick=self.tick,
+            population=len(self.characters),
+            config=self.config,
+            running=self.running,
+            created_at=self.created_at,
+        )
+
+    def touch(self, entity_id: str, *fields: str):
+        """Record that fields of a character (or ENVIRONMENT) changed at the current tick."""
+        self._journal.mark(entity_id, self.tick, *fields)
+
+    def place(self, char_id: str, x: float, y: float):
+        """Move a character, keeping its column row and the spatial index in step."""
+        self._columns.positions[self._columns.slots[char_id]] = (x, y)
+        self._spatial.move(char_id, x, y)
+        self.touch(char_id, "position")
+
+    def relationships_toward(self, char_id: str, other_ids: list[str]) -> np.ndarray:
+        """How a character feels about each of other_ids, read from the relationship matrix."""
+        columns = self._columns
+        return columns.relationships[columns.slots[char_id], [columns.slots[other] for other in other_ids]]
+
+    def adjust_relationships(self, deltas: list[RelationshipDelta]):
+        """Apply relationship deltas as one batch, then refresh the affected relationships dicts."""
+        deltas = [d for d in deltas if d.character_id in self.characters and d.target_id in self.characters]
+        if not deltas:
+            return
+        slots = self._columns.slots
+        rows = np.array([slots[d.character_id] for d in deltas], dtype=np.intp)
+        cols = np.array([slots[d.target_id] for d in deltas], dtype=np.intp)
+        self._columns.add_relationships(rows, cols, np.array([d.amount for d in deltas]))
+        values = self._columns.relationships[rows, cols].tolist()
+        # Deltas come in application order, so new keys land in the dicts in the order they used to.
+        for delta, value in zip(deltas, values):
+            self.characters[delta.character_id].relationships[delta.target_id] = value
+        for char_id in dict.fromkeys(d.character_id for d in deltas):
+            self.touch(char_id, "relationships")
+
+    def delta(self, since_tick: int) -> SimulationDelta:
+        """Characters and environment fields changed at or after since_tick.
+
+        Past the journal's horizon this falls back to a full snapshot, whose
+        characters replace the client's set instead of patching it.
+        """
+        full = not self._journal.covers(since_tick)
+        characters: dict[str, dict[str, Any]] = {}
+        for char_id, char in self.characters.items():
+            fields = [ALL_FIELDS] if full else self._journal.changed_since(char_id, since_tick)
+            if ALL_FIELDS in fields:
+                characters[char_id] = char.model_dump(mode="json")
+            elif fields:
+                characters[char_id] = char.model_dump(mode="json", include=include_spec(fields))
+        fields = [ALL_FIELDS] if full else self._journal.changed_since(ENVIRONMENT, since_tick)
+        if ALL_FIELDS in fields:
+            environment = self.environment.model_dump(mode="json")
+        else:
+            environment = self.environment.model_dump(mode="json", include=include_spec(fields)) if fields else {}
+        return SimulationDelta(
+            id=self.id,
+            since_tick=since_tick,
+            tick=self.tick,
+            running=self.running,
+            config=self.config,
+            characters=characters,
+            removed_characters=[] if full else self._journal.removed_since(since_tick),
+            environment=environment,
+            alliances=self._alliances() if full or self._journal.changed_since(ALLIANCES, since_tick) else None,
+            full=full,
+        )
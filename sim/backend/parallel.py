@@ -0,0 +1,335 @@
+import heapq
+import multiprocessing
+import threading
+from collections import Counter
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+import numpy as np
+from models import SimulationState, Environment, Character, Memory, PersonalityTraits, Action, ActionType
+from agents import AgentBrain, RECENT_EVENT_TICKS, recall_effect
+from columns import CharacterColumns, TRAITS, EMOTIONS
+
+# Below this many living characters a tick decides in-process; shipping the world costs more than it saves.
+PARALLEL_MIN_POPULATION = 64
+
+ACTION_TYPES = list(ActionType)
+_ACTION_CODES = {action_type: code for code, action_type in enumerate(ACTION_TYPES)}
+
+
+# The parts of the Environment that deciding reads; houses (one per character) are left out.
+_ENVIRONMENT_FIELDS = {"resources", "conditions", "locations"}
+
+
+class WorldLayout(NamedTuple):
+    """What a worker needs besides the shared buffer to rebuild a WorldSnapshot."""
+    segment: str
+    ids: list[str]
+    names: list[str]
+    resource_names: list[str]
+    environment_size: int
+
+
+class TickInputs(NamedTuple):
+    """The per-tick scalars deciding reads from the simulation."""
+    tick: int
+    randomness: float
+    information_symmetry: float
+
+
+class RecallTable(NamedTuple):
+    """One character's indexed memories reduced to what recall ranks and reads, a row per memory."""
+    postings: dict[str, list[int]]
+    importance: list[float]
+    positions: list[int]
+    related: list[list[str]]
+    effects: list[float]
+
+    @classmethod
+    def of(cls, memory: Memory) -> "RecallTable":
+        table = cls({}, [], [], [], [])
+        for row, (entry, tokens, position) in enumerate(memory.index.recall_rows(memory.short_term)):
+            for token in tokens:
+                table.postings.setdefault(token, []).append(row)
+            table.importance.append(entry.importance)
+            table.positions.append(position)
+            table.related.append(entry.related_characters)
+            table.effects.append(recall_effect(entry.content))
+        return table
+
+    def recall_effects(self, keywords: set[str], limit: int = 10) -> list[tuple[list[str], float]]:
+        """AgentBrain.recall_effects, ranked as MemoryIndex.search ranks."""
+        overlaps: Counter[int] = Counter()
+        for keyword in keywords:
+            rows = self.postings.get(keyword)
+            if rows:
+                overlaps.update(rows)
+
+        def rank(row: int) -> tuple[float, int]:
+            return overlaps[row] * 0.3 + self.importance[row] * 0.7, -self.positions[row]
+
+        return [(self.related[row], self.effects[row]) for row in heapq.nlargest(limit, overlaps, key=rank)]
+
+
+class DecisionInputs(NamedTuple):
+    """What deciding reads about one character beyond its row of the WorldSnapshot."""
+    id: str
+    goals: list[str]
+    beliefs: dict[str, str]
+    recall: RecallTable
+    recent_titles: list[str]
+
+
+def _columns(n: int, r: int, e: int) -> list[tuple[str, tuple[int, ...], str]]:
+    return [
+        ("positions", (n, 2), "f8"),
+        ("traits", (n, len(TRAITS)), "f8"),
+        ("emotions", (n, len(EMOTIONS)), "f8"),
+        ("resources", (n, r), "f8"),  # NaN where a character lacks the resource
+        ("relationships", (n, n), "f8"),
+        ("alive", (n,), "?"),
+        ("last_action", (n,), "i1"),  # index into ACTION_TYPES, -1 for none
+        ("environment_json", (e,), "u1"),  # _ENVIRONMENT_FIELDS of the Environment, as JSON
+    ]
+
+
+class WorldSnapshot:
+    """Start-of-tick world as NumPy views over one shared buffer, a row per character slot.
+
+    Slots follow sim.characters order, which is also the spatial index's
+    insertion order, so radius queries return neighbours in the same order.
+    """
+
+    def __init__(self, buffer, ids: list[str], names: list[str], resource_names: list[str], environment_size: int):
+        self.ids = ids
+        self.names = names
+        self.resource_names = resource_names
+        self.slots = {char_id: slot for slot, char_id in enumerate(ids)}
+        offset = 0
+        for name, shape, dtype in _columns(len(ids), len(resource_names), environment_size):
+            array = np.ndarray(shape, dtype, buffer, offset)
+            setattr(self, name, array)
+            offset += -(-array.nbytes // 8) * 8
+
+    @staticmethod
+    def nbytes(n: int, r: int, e: int) -> int:
+        return sum(
+            -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8 for _, shape, dtype in _columns(n, r, e)
+        )
+
+    def environment(self) -> Environment:
+        return Environment.model_validate_json(self.environment_json.tobytes())
+
+    def fill(self, characters: list[Character], columns: CharacterColumns, environment: bytes):
+        self.environment_json[:] = np.frombuffer(environment, dtype=np.uint8)
+        slots = columns.slots_of(characters)
+        self.positions[:] = columns.positions[slots]
+        self.traits[:] = columns.traits[slots]
+        self.emotions[:] = columns.emotions[slots]
+        self.alive[:] = columns.alive[slots]
+        self.relationships[:] = columns.relationships[np.ix_(slots, slots)]
+        self.resources[:] = columns.resources[slots]
+        self.last_action[:] = [_ACTION_CODES[c.last_action.type] if c.last_action else -1 for c in characters]
+
+    def query_radius(self, x: float, y: float, radius: float) -> list[tuple[str, float]]:
+        """SpatialGrid.query_radius over the snapshot's positions."""
+        dx = self.positions[:, 0] - x
+        dy = self.positions[:, 1] - y
+        dist = np.sqrt(dx * dx + dy * dy)
+        return [(self.ids[slot], float(dist[slot])) for slot in np.flatnonzero(dist < radius)]
+
+    def relationships_toward(self, char_id: str, other_ids: list[str]) -> np.ndarray:
+        return self.relationships[self.slots[char_id], [self.slots[other] for other in other_ids]]
+
+    def resources_of(self, slot: int) -> dict[str, float]:
+        row = self.resources[slot]
+        return {self.resource_names[col]: float(row[col]) for col in np.flatnonzero(~np.isnan(row))}
+
+
+class _LastAction(NamedTuple):
+    type: ActionType
+
+
+class _Peer:
+    """Read-only stand-in for another Character, as perceive sees it."""
+
+    __slots__ = ("_world", "_slot")
+
+    def __init__(self, world: WorldSnapshot, slot: int):
+        self._world = world
+        self._slot = slot
+
+    @property
+    def name(self) -> str:
+        return self._world.names[self._slot]
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._world.alive[self._slot])
+
+    @property
+    def last_action(self) -> _LastAction | None:
+        code = self._world.last_action[self._slot]
+        return _LastAction(ACTION_TYPES[code]) if code >= 0 else None
+
+    @property
+    def resources(self) -> dict[str, float]:
+        return self._world.resources_of(self._slot)
+
+
+class _Peers:
+
+    def __init__(self, world: WorldSnapshot):
+        self._world = world
+
+    def get(self, char_id: str) -> _Peer | None:
+        slot = self._world.slots.get(char_id)
+        return _Peer(self._world, slot) if slot is not None else None
+
+
+class _Memory(NamedTuple):
+    beliefs: dict[str, str]
+
+
+class _Decider:
+    """Read-only stand-in for the deciding Character: its snapshot row plus its DecisionInputs."""
+
+    def __init__(self, world: WorldSnapshot, inputs: DecisionInputs):
+        slot = world.slots[inputs.id]
+        self.id = inputs.id
+        self.goals = inputs.goals
+        self.memory = _Memory(inputs.beliefs)
+        self.recall = inputs.recall
+        x, y = world.positions[slot].tolist()
+        self.position = {"x": x, "y": y}
+        self.traits = PersonalityTraits.model_construct(**dict(zip(TRAITS, world.traits[slot].tolist())))
+        self.resources = world.resources_of(slot)
+
+
+class _RecentEvent(NamedTuple):
+    title: str
+
+
+class _RecentEvents:
+    """Answers perceive's recent_for lookups from event titles gathered before the fan-out."""
+
+    def __init__(self, titles: dict[str, list[str]]):
+        self._titles = titles
+
+    def recent_for(self, participant: str, since_tick: int) -> list[_RecentEvent]:
+        return [_RecentEvent(title) for title in self._titles.get(participant, [])]
+
+
+class DecisionView:
+    """Stands in for the SimulationState inside a worker: what AgentBrain.choose reads."""
+
+    def __init__(self, world: WorldSnapshot, settings: TickInputs, recent: dict[str, list[str]]):
+        self.tick = settings.tick
+        self.config = settings
+        self.environment = world.environment()
+        self.characters = _Peers(world)
+        self.spatial = world
+        self.events = _RecentEvents(recent)
+        self.relationships_toward = world.relationships_toward
+
+
+class _WorkerBrain(AgentBrain):
+    """Recalls from the shipped RecallTable instead of the character's Memory."""
+
+    def recall_effects(self, character: _Decider, context: str) -> list[tuple[list[str], float]]:
+        return character.recall.recall_effects(set(context.lower().split()))
+
+
+_brain: _WorkerBrain | None = None
+_segments: dict[str, SharedMemory] = {}
+
+
+def _init_worker():
+    global _brain
+    _brain = _WorkerBrain()
+
+
+def _attach(layout: WorldLayout) -> WorldSnapshot:
+    segment = _segments.get(layout.segment)
+    if segment is None:
+        for stale in _segments.values():
+            stale.close()
+        _segments.clear()
+        segment = _segments[layout.segment] = SharedMemory(layout.segment)
+    return WorldSnapshot(segment.buf, *layout[1:])
+
+
+def _choose_chunk(layout: WorldLayout, settings: TickInputs, chunk: list[DecisionInputs]) -> list[Action]:
+    world = _attach(layout)
+    view = DecisionView(world, settings, {inputs.id: inputs.recent_titles for inputs in chunk})
+    characters = [_Decider(world, inputs) for inputs in chunk]
+    slots = np.array([world.slots[inputs.id] for inputs in chunk], dtype=np.intp)
+    base_scores = _brain.kernel.base_scores_in(world, slots, [inputs.goals for inputs in chunk])
+    return [_brain.choose(char, view, scores) for char, scores in zip(characters, base_scores)]
+
+
+class ParallelDecider:
+    """Runs the decision phase of a tick across a pool of worker processes.
+
+    Per tick, the world and the environment are written once into shared
+    memory (see WorldSnapshot); each worker attaches to it and is sent only
+    the tick's scalars and the DecisionInputs of its own chunk of deciding
+    characters: goals, beliefs, a RecallTable and recent event titles.
+    Chunks are concatenated in order, so the result matches deciding
+    serially.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._segment: SharedMemory | None = None
+        # Started before forking so workers register their attachments with this process's tracker.
+        resource_tracker.ensure_running()
+        # fork: workers inherit this process's hash() secret, which seeds every decision's RNG,
+        # so actions are identical to the serial path. Create the engine before starting threads.
+        self._pool = multiprocessing.get_context("fork").Pool(workers, initializer=_init_worker)
+
+    def _publish(self, sim: SimulationState) -> WorldLayout:
+        characters = list(sim.characters.values())
+        resource_names = list(sim.columns.resource_names)
+        environment = sim.environment.model_dump_json(include=_ENVIRONMENT_FIELDS).encode()
+        size = max(WorldSnapshot.nbytes(len(characters), len(resource_names), len(environment)), 1)
+        if self._segment is None or self._segment.size < size:
+            self._release()
+            self._segment = SharedMemory(create=True, size=size + size // 2)
+        layout = WorldLayout(
+            self._segment.name, list(sim.characters), [c.name for c in characters], resource_names, len(environment),
+        )
+        WorldSnapshot(self._segment.buf, *layout[1:]).fill(characters, sim.columns, environment)
+        return layout
+
+    def choose_all(self, sim: SimulationState, living: list[Character]) -> list[Action]:
+        since_tick = sim.tick - RECENT_EVENT_TICKS
+        settings = TickInputs(sim.tick, sim.config.randomness, sim.config.information_symmetry)
+        with self._lock:
+            layout = self._publish(sim)
+            tasks = []
+            for chunk in np.array_split(np.arange(len(living)), self.workers):
+                if not len(chunk):
+                    continue
+                inputs = [
+                    DecisionInputs(
+                        char.id, char.goals, char.memory.beliefs, RecallTable.of(char.memory),
+                        [event.title for event in sim.events.recent_for(char.id, since_tick)],
+                    )
+                    for char in (living[i] for i in chunk)
+                ]
+                tasks.append((layout, settings, inputs))
+            return [action for actions in self._pool.starmap(_choose_chunk, tasks) for action in actions]
+
+    def _release(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+        with self._lock:
+            self._release()
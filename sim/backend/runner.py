@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Callable
+from service import SimulationService
+
+DEFAULT_TICK_RATE = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationRunner:
+    """Advances running simulations in the background, one worker-thread tick at a time."""
+
+    def __init__(self, service: SimulationService):
+        self.service = service
+        self.tick_rates: dict[str, float] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        # Called as listener(sim_id, running) on the event loop whenever a simulation starts or stops.
+        self.listeners: list[Callable[[str, bool], None]] = []
+
+    def is_running(self, sim_id: str) -> bool:
+        return sim_id in self._tasks
+
+    def start(self, sim_id: str, tick_rate: float | None = None):
+        """Start (or retune) the background loop; tick_rate is ticks per second."""
+        if tick_rate is not None:
+            self.tick_rates[sim_id] = tick_rate
+        self.tick_rates.setdefault(sim_id, DEFAULT_TICK_RATE)
+        if sim_id not in self._tasks:
+            self.service.set_running(sim_id, True)
+            self._tasks[sim_id] = asyncio.create_task(self._run(sim_id))
+            self._notify(sim_id, True)
+
+    def pause(self, sim_id: str):
+        task = self._tasks.pop(sim_id, None)
+        if task is not None:
+            task.cancel()
+        self.service.set_running(sim_id, False)
+        if task is not None:
+            self._notify(sim_id, False)
+
+    def resume(self, sim_id: str):
+        self.start(sim_id)
+
+    def forget(self, sim_id: str):
+        self.pause(sim_id)
+        self.tick_rates.pop(sim_id, None)
+
+    async def shutdown(self):
+        tasks = list(self._tasks.values())
+        for sim_id in list(self._tasks):
+            self.pause(sim_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, sim_id: str):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                started = loop.time()
+                # The tick runs in a worker thread; the engine's per-simulation lock serializes it with requests.
+                if not await asyncio.to_thread(self.service.run_tick, sim_id):
+                    break
+                interval = 1.0 / self.tick_rates[sim_id]
+                await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+        except Exception:
+            # A failed tick pauses the simulation instead of leaving it marked running with no loop.
+            logger.exception("Background tick failed for simulation %s; pausing it", sim_id)
+        finally:
+            if self._tasks.get(sim_id) is asyncio.current_task():
+                del self._tasks[sim_id]
+                self.service.set_running(sim_id, False)
+                self._notify(sim_id, False)
+
+    def _notify(self, sim_id: str, running: bool):
+        for listener in self.listeners:
+            listener(sim_id, running)
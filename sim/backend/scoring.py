@@ -0,0 +1,172 @@
+from typing import NamedTuple
+import numpy as np
+from models import Character, ActionType
+from columns import TRAITS, EMOTIONS
+
+
+ACTIONS: list[ActionType] = list(ActionType)
+ACTION_INDEX: dict[ActionType, int] = {a: i for i, a in enumerate(ACTIONS)}
+
+TARGETED_ACTIONS: list[ActionType] = [
+    a for a in ACTIONS if a in {
+        ActionType.COOPERATE, ActionType.COMPETE, ActionType.NEGOTIATE,
+        ActionType.ALLY, ActionType.BETRAY, ActionType.ATTACK,
+        ActionType.DEFEND, ActionType.SHARE, ActionType.COMMUNICATE,
+    }
+]
+
+BELIEF_CODES: dict[str, int] = {"untrustworthy": 1, "ally": 2}
+
+
+class Candidate(NamedTuple):
+    action_type: ActionType
+    target_id: str | None
+    score: float
+
+
+class Options(NamedTuple):
+    """Every option for one character as parallel arrays: ACTIONS order, targeted actions expanded per target."""
+    scores: np.ndarray
+    actions: np.ndarray  # index into ACTIONS
+    targets: np.ndarray  # index into the nearby characters, -1 for untargeted actions
+
+
+def _action_row(weights: dict[ActionType, float], scale: float = 1.0) -> np.ndarray:
+    row = np.zeros(len(ACTIONS))
+    for action_type, weight in weights.items():
+        row[ACTION_INDEX[action_type]] = weight * scale
+    return row
+
+
+class ScoringKernel:
+    """Dense trait/emotion/goal tables compiled once and applied to a whole population."""
+
+    def __init__(
+        self,
+        personality_weights: dict[str, dict[ActionType, float]],
+        emotion_weights: dict[str, dict[ActionType, float]],
+        goal_actions: dict[str, list[ActionType]],
+    ):
+        self.trait_names = list(personality_weights)
+        self.emotion_names = list(emotion_weights)
+        self.trait_matrix = np.stack([_action_row(personality_weights[t]) for t in self.trait_names])
+        self.emotion_matrix = np.stack([_action_row(emotion_weights[e], 0.5) for e in self.emotion_names])
+        self.goal_actions = goal_actions
+        self._goal_cache: dict[tuple[str, ...], np.ndarray] = {}
+
+        # Per-target terms, one column per targeted action.
+        relationship_coef = {
+            ActionType.COOPERATE: 0.5, ActionType.ALLY: 0.5, ActionType.SHARE: 0.5, ActionType.COMMUNICATE: 0.5,
+            ActionType.ATTACK: -0.4, ActionType.BETRAY: -0.4, ActionType.COMPETE: -0.4,
+        }
+        self.relationship_coef = np.array([relationship_coef.get(a, 0.0) for a in TARGETED_ACTIONS])
+        untrustworthy = {
+            ActionType.COOPERATE: -0.6, ActionType.ALLY: -0.6, ActionType.SHARE: -0.6,
+            ActionType.DEFEND: 0.3, ActionType.COMPETE: 0.3,
+        }
+        ally = {
+            ActionType.COOPERATE: 0.4, ActionType.ALLY: 0.4, ActionType.SHARE: 0.4,
+            ActionType.ATTACK: -0.7, ActionType.BETRAY: -0.7,
+        }
+        self.belief_adjustments = np.array([
+            [0.0] * len(TARGETED_ACTIONS),
+            [untrustworthy.get(a, 0.0) for a in TARGETED_ACTIONS],
+            [ally.get(a, 0.0) for a in TARGETED_ACTIONS],
+        ])
+        self._targeted_columns = np.array([ACTION_INDEX[a] for a in TARGETED_ACTIONS])
+        self._solo_columns = np.array([i for i, a in enumerate(ACTIONS) if a not in TARGETED_ACTIONS])
+        self._layouts: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._rest = ACTION_INDEX[ActionType.REST]
+        self._gather = ACTION_INDEX[ActionType.GATHER]
+
+    def goal_boost(self, goals: list[str]) -> np.ndarray:
+        key = tuple(goals)
+        boost = self._goal_cache.get(key)
+        if boost is None:
+            values = [0.0] * len(ACTIONS)
+            for goal in goals:
+                goal_lower = goal.lower()
+                for keyword, boosted_actions in self.goal_actions.items():
+                    if keyword in goal_lower:
+                        for action_type in boosted_actions:
+                            values[ACTION_INDEX[action_type]] += 0.4
+            boost = np.array(values)
+            self._goal_cache[key] = boost
+        return boost
+
+    def base_scores(self, characters: list[Character]) -> np.ndarray:
+        """Score every action for every character before any per-target terms (N x actions)."""
+        if not characters:
+            return np.zeros((0, len(ACTIONS)))
+        return self.base_scores_from(
+            np.array([[getattr(c.traits, t) for t in self.trait_names] for c in characters]),
+            np.array([[getattr(c.emotional_state, e, 0.0) for e in self.emotion_names] for c in characters]),
+            [c.goals for c in characters],
+            np.array([c.resources.get("energy", 50) for c in characters]),
+            np.array([any(v < 30 for v in c.resources.values()) for c in characters]),
+        )
+
+    def base_scores_in(self, table, slots: np.ndarray, goals: list[list[str]]) -> np.ndarray:
+        """base_scores read from rows of a column table (CharacterColumns or a WorldSnapshot)."""
+        emotions = table.emotions[slots]
+        energy = np.full(len(slots), 50.0)
+        if "energy" in table.resource_names:
+            column = table.resources[slots, table.resource_names.index("energy")]
+            energy = np.where(np.isnan(column), 50.0, column)
+        return self.base_scores_from(
+            table.traits[slots][:, [TRAITS.index(t) for t in self.trait_names]],
+            np.stack(
+                [emotions[:, EMOTIONS.index(e)] if e in EMOTIONS else np.zeros(len(slots)) for e in self.emotion_names],
+                axis=1,
+            ),
+            goals,
+            energy,
+            (table.resources[slots] < 30).any(axis=1),
+        )
+
+    def base_scores_from(
+        self, traits: np.ndarray, emotions: np.ndarray, goals: list[list[str]], energy: np.ndarray, scarce: np.ndarray,
+    ) -> np.ndarray:
+        """base_scores from columns: traits and emotions ordered as trait_names/emotion_names, one row per character."""
+        scores = np.zeros((len(goals), len(ACTIONS)))
+        # Accumulated column by column so the sums match the scalar per-action loop exactly.
+        for i in range(len(self.trait_names)):
+            scores += traits[:, i:i + 1] * self.trait_matrix[i]
+        for i in range(len(self.emotion_names)):
+            scores += emotions[:, i:i + 1] * self.emotion_matrix[i]
+        scores += np.stack([self.goal_boost(g) for g in goals])
+
+        scores[:, self._rest] += np.where(energy < 40, 0.5, 0.0)
+        scores[:, self._gather] += np.where(scarce, 0.4, 0.0)
+        return scores
+
+    def target_scores(
+        self, base: np.ndarray, relationships: np.ndarray, beliefs: np.ndarray, distances: np.ndarray,
+    ) -> np.ndarray:
+        """Score each targeted action against each nearby character (targets x targeted actions)."""
+        scores = base[self._targeted_columns] + relationships[:, None] * self.relationship_coef
+        scores += self.belief_adjustments[beliefs]
+        scores += (np.maximum(0.0, 1.0 - distances / 200) * 0.2)[:, None]
+        return scores
+
+    def _layout(self, targets: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(actions, targets, solo positions, targeted positions) of the option arrays for a target count."""
+        layout = self._layouts.get(targets)
+        if layout is None:
+            per_action = np.where(np.isin(np.arange(len(ACTIONS)), self._targeted_columns), targets, 1)
+            actions = np.repeat(np.arange(len(ACTIONS)), per_action)
+            solo = np.isin(actions, self._solo_columns)
+            target_index = np.tile(np.arange(targets), len(self._targeted_columns)) if targets else np.zeros(0, int)
+            indices = np.full(len(actions), -1)
+            indices[~solo] = target_index
+            layout = (actions, indices, np.flatnonzero(solo), np.flatnonzero(~solo))
+            self._layouts[targets] = layout
+        return layout
+
+    def options(self, base: np.ndarray, target_scores: np.ndarray) -> Options:
+        """Lay out base scores and target_scores (targets x targeted actions) as one Options row."""
+        actions, targets, solo, targeted = self._layout(len(target_scores))
+        scores = np.empty(len(actions))
+        scores[solo] = base[self._solo_columns]
+        scores[targeted] = target_scores.T.ravel()
+        return Options(scores, actions, targets)
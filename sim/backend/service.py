@@ -0,0 +1,266 @@
+import json
+from typing import Any, Callable
+from pydantic import BaseModel, TypeAdapter
+from models import (
+    SimulationState, SimulationConfig, Character, CharacterCreate,
+    Event, EventType, ChatMessage, AdvanceSummary, SimulationDelta, SimulationSummary, Coalition,
+)
+from engine import SimulationEngine
+from cache import StateCache
+
+_EVENTS = TypeAdapter(list[Event])
+_CHAT = TypeAdapter(list[ChatMessage])
+_COALITIONS = TypeAdapter(list[Coalition])
+
+FrameListener = Callable[[str, int, str], None]
+
+
+class ServiceError(Exception):
+    """An error reported to the API client with an HTTP status."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StepResponse(BaseModel):
+    events: list[Event]
+    state: SimulationState | None = None
+    delta: SimulationDelta | None = None  # set instead of state when since_tick is given
+    chat_messages: list[ChatMessage]
+
+
+class AdvanceResponse(AdvanceSummary):
+    state: SimulationState | None = None
+
+
+class SimulationService:
+    """The API's operations on simulations, run next to the engine that owns them.
+
+    Results are pre-encoded JSON or small picklable values, so the same calls
+    work in-process and across a shard's IPC channel (see shards.py).
+    """
+
+    def __init__(self, engine: SimulationEngine):
+        self.engine = engine
+        self.cache = StateCache(engine)
+        # Called as listener(sim_id, tick, frame) after each tick of a watched simulation.
+        self.frame_listeners: list[FrameListener] = []
+        self._watched: set[str] = set()
+        engine.listeners.append(self._publish)
+
+    def start(self):
+        pass
+
+    def close(self):
+        self.engine.close()
+
+    def has(self, sim_id: str) -> bool:
+        return sim_id in self.engine.simulations
+
+    def _sim(self, sim_id: str) -> SimulationState:
+        sim = self.engine.simulations.get(sim_id)
+        if sim is None:
+            raise ServiceError(404, "Simulation not found")
+        return sim
+
+    def _character(self, sim: SimulationState, char_id: str) -> Character:
+        char = sim.characters.get(char_id)
+        if char is None:
+            raise ServiceError(404, "Character not found")
+        return char
+
+    def list_summaries(self) -> list[SimulationSummary]:
+        return [sim.summary() for sim in list(self.engine.simulations.values())]
+
+    def create_simulation(self, config: SimulationConfig | None) -> tuple[str, bytes]:
+        sim = self.engine.create_simulation(config)
+        return sim.id, sim.model_dump_json().encode()
+
+    def get_simulation(
+        self, sim_id: str, view: str, include: dict | None = None, exclude: dict | None = None,
+        since_tick: int | None = None, if_none_match: str | None = None,
+    ) -> tuple[str, bytes | None]:
+        """(etag, body); body is None when if_none_match is still current."""
+        self._sim(sim_id)
+        etag = self.cache.etag(self.cache.key(sim_id))
+        if if_none_match == etag:
+            return etag, None
+        if since_tick is None:
+            return self.cache.get(
+                sim_id, view, lambda sim: sim.model_dump_json(include=include, exclude=exclude).encode(),
+            )
+        return self.cache.get(sim_id, view, lambda sim: sim.delta(since_tick).model_dump_json().encode())
+
+    def step(self, sim_id: str, since_tick: int | None = None) -> bytes:
+        self._sim(sim_id)
+
+        def respond(sim: SimulationState, events: list[Event], chat_messages: list[ChatMessage]) -> bytes:
+            if since_tick is not None:
+                result = StepResponse(events=events, delta=sim.delta(since_tick), chat_messages=chat_messages)
+            else:
+                result = StepResponse(events=events, state=sim, chat_messages=chat_messages)
+            return result.model_dump_json().encode()
+
+        # Concurrent step requests on one simulation are batched into back-to-back ticks, each
+        # response serialized right after its own tick.
+        try:
+            return self.engine.step_coalesced(sim_id, respond)
+        except KeyError:
+            self._sim(sim_id)  # deleted while queued: 404
+            raise
+
+    def advance(
+        self, sim_id: str, ticks: int | None, until_tick: int | None,
+        stop_on: set[EventType], include_state: bool,
+    ) -> bytes:
+        self._sim(sim_id)
+        summary = self.engine.advance(sim_id, ticks=ticks, until_tick=until_tick, stop_on=stop_on)
+        with self.engine.lock(sim_id):
+            state = self._sim(sim_id) if include_state else None
+            return AdvanceResponse(**summary.model_dump(), state=state).model_dump_json().encode()
+
+    def run_tick(self, sim_id: str) -> bool:
+        """One background tick; False once the simulation is gone or has reached max_ticks."""
+        sim = self.engine.simulations.get(sim_id)
+        if sim is None or sim.tick >= sim.config.max_ticks:
+            return False
+        self.engine.step(sim_id)
+        return True
+
+    def tick(self, sim_id: str) -> int:
+        return self._sim(sim_id).tick
+
+    def set_running(self, sim_id: str, running: bool):
+        sim = self.engine.simulations.get(sim_id)
+        if sim is not None:
+            sim.running = running
+
+    def update_config(self, sim_id: str, config: SimulationConfig) -> bytes:
+        self._sim(sim_id)
+        self.engine.update_config(sim_id, config)
+        with self.engine.lock(sim_id):
+            return self._sim(sim_id).model_dump_json().encode()
+
+    def delete_simulation(self, sim_id: str):
+        self._sim(sim_id)
+        self.engine.delete_simulation(sim_id)
+        self.cache.forget(sim_id)
+        self._watched.discard(sim_id)
+
+    def add_character(self, sim_id: str, char_create: CharacterCreate) -> bytes:
+        self._sim(sim_id)
+        char = self.engine.add_character(sim_id, char_create)
+        with self.engine.lock(sim_id):
+            return char.model_dump_json().encode()
+
+    def get_character(
+        self, sim_id: str, char_id: str, include: dict | None = None, exclude: dict | None = None,
+    ) -> bytes:
+        with self.engine.lock(sim_id):
+            char = self._character(self._sim(sim_id), char_id)
+            return char.model_dump_json(include=include, exclude=exclude).encode()
+
+    def remove_character(self, sim_id: str, char_id: str):
+        self._character(self._sim(sim_id), char_id)
+        self.engine.remove_character(sim_id, char_id)
+
+    def get_memory(self, sim_id: str, char_id: str) -> bytes:
+        with self.engine.lock(sim_id):
+            return self._character(self._sim(sim_id), char_id).memory.model_dump_json().encode()
+
+    def get_reasoning(self, sim_id: str, char_id: str) -> dict[str, Any]:
+        with self.engine.lock(sim_id):
+            char = self._character(self._sim(sim_id), char_id)
+            return {
+                "character_id": char_id,
+                "name": char.name,
+                "last_action": char.last_action.model_dump(mode="json") if char.last_action else None,
+                "last_reasoning": char.last_reasoning,
+            }
+
+    def get_events(
+        self, sim_id: str, since_tick: int, until_tick: int | None, event_type: EventType | None,
+        participant: str | None, min_importance: float | None, cursor: int | None, limit: int | None,
+    ) -> tuple[bytes, int | None]:
+        with self.engine.lock(sim_id):
+            events, next_cursor = self._sim(sim_id).events.query(
+                since_tick=since_tick,
+                until_tick=until_tick,
+                event_type=event_type,
+                participant=participant,
+                min_importance=min_importance,
+                cursor=cursor,
+                limit=limit,
+            )
+        return _EVENTS.dump_json(events), next_cursor
+
+    def get_chat(
+        self, sim_id: str, since_tick: int, until_tick: int | None, cursor: int | None, limit: int | None,
+    ) -> tuple[bytes, int | None]:
+        with self.engine.lock(sim_id):
+            messages, next_cursor = self._sim(sim_id).chat_log.page(since_tick, until_tick, cursor, limit)
+        return _CHAT.dump_json(messages), next_cursor
+
+    def get_coalitions(self, sim_id: str, min_size: int) -> bytes:
+        with self.engine.lock(sim_id):
+            sim = self._sim(sim_id)
+            coalitions = [
+                Coalition(members=members, names=[sim.characters[cid].name for cid in members], formed_tick=formed_tick)
+                for members, formed_tick in sim.coalitions.coalitions(min_size)
+            ]
+        return _COALITIONS.dump_json(coalitions)
+
+    def watch(self, sim_id: str, watching: bool):
+        """Start or stop building stream frames for a simulation."""
+        if watching:
+            self._watched.add(sim_id)
+        else:
+            self._watched.discard(sim_id)
+
+    def snapshot(self, sim_id: str) -> tuple[int, str]:
+        """Tick and full state minus event/chat history, taken under the lock."""
+        with self.engine.lock(sim_id):
+            sim = self._sim(sim_id)
+            return sim.tick, sim.model_dump_json(exclude={"events", "chat_log"})
+
+    def _publish(self, sim: SimulationState, events: list[Event], chat_messages: list[ChatMessage]):
+        """Engine listener; runs under the simulation lock right after a tick."""
+        if sim.id not in self._watched or not self.frame_listeners:
+            return
+        # The journal covers everything touched while running this tick and since the last one.
+        delta = sim.delta(sim.tick - 1)
+        frame: dict[str, Any] = {
+            "type": "tick",
+            "tick": sim.tick,
+            "running": sim.running,
+            "events": [e.model_dump(mode="json") for e in events],
+            "chat_messages": [m.model_dump(mode="json") for m in chat_messages],
+            "characters": delta.characters,
+            "removed_characters": delta.removed_characters,
+        }
+        if delta.environment:
+            frame["environment"] = delta.environment
+        if delta.alliances is not None:
+            frame["alliances"] = delta.alliances.model_dump(mode="json")
+        encoded = json.dumps(frame)
+        for listener in self.frame_listeners:
+            listener(sim.id, sim.tick, encoded)
+
+    def export_simulation(self, sim_id: str) -> tuple[SimulationState, int]:
+        """Hand a simulation off to another engine; it stops existing here."""
+        self._sim(sim_id)
+        sim, revision = self.engine.detach_simulation(sim_id)
+        self.cache.forget(sim_id)
+        self._watched.discard(sim_id)
+        return sim, revision
+
+    def import_simulation(self, sim: SimulationState, revision: int):
+        self.engine.attach_simulation(sim, revision)
+
+    def shard_loads(self) -> list[int]:
+        return [len(self.engine.simulations)]
+
+    def rebalance(self) -> list[tuple[str, int, int]]:
+        return []
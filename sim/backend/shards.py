@@ -0,0 +1,256 @@
+import itertools
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any
+from models import SimulationConfig, SimulationSummary
+from engine import SimulationEngine
+from service import SimulationService, ServiceError, FrameListener
+
+WORKER_THREADS = 8
+
+# SimulationService methods whose first argument is a sim_id; they run on the owning shard.
+_ROUTED = frozenset({
+    "get_simulation", "step", "advance", "tick", "update_config", "add_character", "get_character",
+    "remove_character", "get_memory", "get_reasoning", "get_events", "get_chat", "get_coalitions", "snapshot",
+})
+
+
+def _worker_main(conn: Connection, archive_dir: str | None):
+    """Shard process: owns a SimulationEngine and serves SimulationService calls over conn."""
+    service = SimulationService(SimulationEngine(archive_dir))
+    send_lock = threading.Lock()
+
+    def send(message: tuple):
+        with send_lock:
+            conn.send(message)
+
+    def run(request_id: int, method: str, args: tuple):
+        try:
+            result = getattr(service, method)(*args)
+        except ServiceError as exc:
+            send(("reply", request_id, False, exc))
+        except Exception as exc:
+            send(("reply", request_id, False, ServiceError(500, f"{type(exc).__name__}: {exc}")))
+        else:
+            send(("reply", request_id, True, result))
+
+    service.frame_listeners.append(lambda sim_id, tick, frame: send(("frame", sim_id, tick, frame)))
+    pool = ThreadPoolExecutor(WORKER_THREADS)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        request_id, method, args = message
+        if request_id is None:
+            # One-way notifications are cheap and applied in arrival order.
+            getattr(service, method)(*args)
+        else:
+            pool.submit(run, request_id, method, args)
+    pool.shutdown(wait=True)
+
+
+class _Shard:
+    """Parent-side handle on one worker process."""
+
+    def __init__(self, context, archive_dir: str | None, frame_listeners: list[FrameListener]):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, archive_dir), daemon=True)
+        self.process.start()
+        child.close()
+        self.frame_listeners = frame_listeners
+        self._ids = itertools.count()
+        self._pending: dict[int, Future] = {}
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def call(self, method: str, *args) -> Any:
+        future: Future = Future()
+        with self._send_lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.conn.send((request_id, method, args))
+        return future.result()
+
+    def notify(self, method: str, *args):
+        with self._send_lock:
+            self.conn.send((None, method, args))
+
+    def _read(self):
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "frame":
+                _, sim_id, tick, frame = message
+                for listener in self.frame_listeners:
+                    listener(sim_id, tick, frame)
+                continue
+            _, request_id, ok, value = message
+            future = self._pending.pop(request_id)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        for future in self._pending.values():
+            future.set_exception(ServiceError(503, "Shard stopped"))
+        self._pending.clear()
+
+    def close(self):
+        try:
+            with self._send_lock:
+                self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class ShardPool:
+    """Runs each simulation in one of several worker processes that owns its state.
+
+    Exposes the SimulationService interface; calls are routed to the owning
+    shard by sim_id and run there, so different simulations tick on different
+    cores. Simulations can be migrated between shards as pickled state.
+    """
+
+    def __init__(self, shards: int, archive_dir: str | None = None):
+        self.shard_count = shards
+        self.archive_dir = archive_dir
+        self.frame_listeners: list[FrameListener] = []
+        self._shards: list[_Shard] = []
+        self._routes: dict[str, int] = {}
+        self._watched: set[str] = set()
+        self._inflight: Counter[str] = Counter()
+        self._moving: set[str] = set()
+        self._cond = threading.Condition()
+
+    def start(self):
+        # spawn: the parent runs threads (uvicorn, readers), which fork would copy mid-flight.
+        context = multiprocessing.get_context("spawn")
+        self._shards = [_Shard(context, self.archive_dir, self.frame_listeners) for _ in range(self.shard_count)]
+
+    def close(self):
+        for shard in self._shards:
+            shard.close()
+        self._shards = []
+
+    def has(self, sim_id: str) -> bool:
+        return sim_id in self._routes
+
+    def _enter(self, sim_id: str) -> int:
+        with self._cond:
+            while sim_id in self._moving:
+                self._cond.wait()
+            index = self._routes.get(sim_id)
+            if index is None:
+                raise ServiceError(404, "Simulation not found")
+            self._inflight[sim_id] += 1
+            return index
+
+    def _exit(self, sim_id: str):
+        with self._cond:
+            self._inflight[sim_id] -= 1
+            if self._inflight[sim_id] <= 0:
+                del self._inflight[sim_id]
+                self._cond.notify_all()
+
+    def _call(self, sim_id: str, method: str, *args) -> Any:
+        index = self._enter(sim_id)
+        try:
+            return self._shards[index].call(method, sim_id, *args)
+        finally:
+            self._exit(sim_id)
+
+    def __getattr__(self, name: str):
+        if name not in _ROUTED:
+            raise AttributeError(name)
+        return lambda sim_id, *args: self._call(sim_id, name, *args)
+
+    def shard_loads(self) -> list[int]:
+        loads = [0] * len(self._shards)
+        for index in list(self._routes.values()):
+            loads[index] += 1
+        return loads
+
+    def list_summaries(self) -> list[SimulationSummary]:
+        summaries = [s for shard in self._shards for s in shard.call("list_summaries")]
+        return sorted(summaries, key=lambda s: s.created_at)
+
+    def create_simulation(self, config: SimulationConfig | None) -> tuple[str, bytes]:
+        loads = self.shard_loads()
+        index = loads.index(min(loads))
+        sim_id, body = self._shards[index].call("create_simulation", config)
+        with self._cond:
+            self._routes[sim_id] = index
+        return sim_id, body
+
+    def delete_simulation(self, sim_id: str):
+        self._call(sim_id, "delete_simulation")
+        with self._cond:
+            self._routes.pop(sim_id, None)
+            self._watched.discard(sim_id)
+
+    def run_tick(self, sim_id: str) -> bool:
+        if sim_id not in self._routes:
+            return False
+        return self._call(sim_id, "run_tick")
+
+    def set_running(self, sim_id: str, running: bool):
+        index = self._routes.get(sim_id)
+        if index is not None:
+            self._shards[index].notify("set_running", sim_id, running)
+
+    def watch(self, sim_id: str, watching: bool):
+        if watching:
+            self._watched.add(sim_id)
+        else:
+            self._watched.discard(sim_id)
+        index = self._routes.get(sim_id)
+        if index is not None:
+            self._shards[index].notify("watch", sim_id, watching)
+
+    def migrate(self, sim_id: str, target: int):
+        """Move a simulation to another shard once requests in flight on it have finished."""
+        with self._cond:
+            while sim_id in self._moving:
+                self._cond.wait()
+            self._moving.add(sim_id)
+            while self._inflight[sim_id] > 0:
+                self._cond.wait()
+        try:
+            source = self._routes.get(sim_id)
+            if source is None or source == target:
+                return
+            sim, revision = self._shards[source].call("export_simulation", sim_id)
+            self._shards[target].call("import_simulation", sim, revision)
+            self._routes[sim_id] = target
+            if sim_id in self._watched:
+                self._shards[target].notify("watch", sim_id, True)
+        finally:
+            with self._cond:
+                self._moving.discard(sim_id)
+                self._cond.notify_all()
+
+    def rebalance(self) -> list[tuple[str, int, int]]:
+        """Migrate simulations off the busiest shards until loads differ by at most one."""
+        moves: list[tuple[str, int, int]] = []
+        while self._shards:
+            loads = self.shard_loads()
+            busiest = loads.index(max(loads))
+            idlest = loads.index(min(loads))
+            if loads[busiest] - loads[idlest] <= 1:
+                break
+            sim_id = next(s for s, index in list(self._routes.items()) if index == busiest)
+            self.migrate(sim_id, idlest)
+            moves.append((sim_id, busiest, idlest))
+        return moves
@@ -0,0 +1,93 @@
+import math
+
+
+class SpatialGrid:
+    """Uniform hash grid over character positions for radius queries."""
+
+    def __init__(self, cell_size: float = 25.0):
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self._positions: dict[str, tuple[float, float]] = {}
+        self._cell_of: dict[str, tuple[int, int]] = {}
+        self._order: dict[str, int] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, item_id: str, x: float, y: float):
+        if item_id in self._positions:
+            self.move(item_id, x, y)
+            return
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, set()).add(item_id)
+        self._positions[item_id] = (x, y)
+        self._cell_of[item_id] = cell
+        self._order[item_id] = self._next_order
+        self._next_order += 1
+
+    def move(self, item_id: str, x: float, y: float):
+        old_cell = self._cell_of.get(item_id)
+        if old_cell is None:
+            self.insert(item_id, x, y)
+            return
+        self._positions[item_id] = (x, y)
+        new_cell = self._cell(x, y)
+        if new_cell == old_cell:
+            return
+        self._discard_from_cell(item_id, old_cell)
+        self._cells.setdefault(new_cell, set()).add(item_id)
+        self._cell_of[item_id] = new_cell
+
+    def remove(self, item_id: str):
+        cell = self._cell_of.pop(item_id, None)
+        if cell is None:
+            return
+        self._discard_from_cell(item_id, cell)
+        del self._positions[item_id]
+        del self._order[item_id]
+
+    def _discard_from_cell(self, item_id: str, cell: tuple[int, int]):
+        members = self._cells[cell]
+        members.discard(item_id)
+        if not members:
+            del self._cells[cell]
+
+    def query_radius(self, x: float, y: float, radius: float) -> list[tuple[str, float]]:
+        """Return (id, distance) for every item strictly within radius, in insertion order."""
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+
+        span = (max_cx - min_cx + 1) * (max_cy - min_cy + 1)
+        if span > len(self._cells):
+            # Radius covers more cells than are occupied; walk the occupied ones instead.
+            candidate_cells = [
+                members for (cx, cy), members in self._cells.items()
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy
+            ]
+        else:
+            candidate_cells = []
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    members = self._cells.get((cx, cy))
+                    if members:
+                        candidate_cells.append(members)
+
+        hits: list[tuple[int, str, float]] = []
+        for members in candidate_cells:
+            for item_id in members:
+                px, py = self._positions[item_id]
+                dx = px - x
+                dy = py - y
+                dist = math.sqrt(dx * dx + dy * dy)
+                if dist < radius:
+                    hits.append((self._order[item_id], item_id, dist))
+
+        hits.sort()
+        return [(item_id, dist) for _, item_id, dist in hits]
@@ -0,0 +1,116 @@
+import asyncio
+import json
+from fastapi import WebSocket, WebSocketDisconnect
+from service import SimulationService, ServiceError
+
+DEFAULT_QUEUE_SIZE = 8
+RESYNC = object()
+
+
+class Subscriber:
+    """One spectator socket with a bounded frame queue."""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.resyncing = False
+        self.min_tick = -1  # frames at or below this tick are already covered by a snapshot
+
+    def offer(self, tick: int, frame: str):
+        if tick <= self.min_tick:
+            return
+        self.push(frame, tick)
+
+    def push(self, frame: str, tick: int | None = None):
+        if self.resyncing:
+            return
+        try:
+            self.queue.put_nowait((tick, frame))
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog and send one snapshot when the client catches up.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resyncing = True
+            self.queue.put_nowait(RESYNC)
+
+
+class TickStreamHub:
+    """Fans per-tick delta frames out to WebSocket spectators.
+
+    The service builds and serializes each tick's frame once, in the thread
+    (or shard process) that ran the tick, and only for watched simulations;
+    the hub hands the same string to every spectator.
+    """
+
+    def __init__(self, service: SimulationService, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.service = service
+        self.queue_size = queue_size
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        service.frame_listeners.append(self.publish)
+
+    def publish(self, sim_id: str, tick: int, frame: str):
+        """Service frame listener; may be called from any thread."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fan_out, sim_id, tick, frame)
+
+    def publish_status(self, sim_id: str, running: bool):
+        """Runner listener; tells spectators a background run started or stopped."""
+        if not self._subscribers.get(sim_id):
+            return
+        frame = json.dumps({"type": "status", "running": running})
+        for subscriber in self._subscribers[sim_id]:
+            # Status frames are not tick deltas, so they bypass the snapshot tick filter.
+            subscriber.push(frame)
+
+    def _fan_out(self, sim_id: str, tick: int, frame: str):
+        for subscriber in self._subscribers.get(sim_id, ()):
+            subscriber.offer(tick, frame)
+
+    async def _snapshot(self, sim_id: str, subscriber: Subscriber) -> str:
+        # Frames that arrive while the snapshot is taken are queued, then filtered by its tick.
+        subscriber.resyncing = False
+        tick, state = await asyncio.to_thread(self.service.snapshot, sim_id)
+        subscriber.min_tick = tick
+        return f'{{"type": "snapshot", "tick": {tick}, "state": {state}}}'
+
+    async def _send(self, websocket: WebSocket, sim_id: str, subscriber: Subscriber):
+        try:
+            await websocket.send_text(await self._snapshot(sim_id, subscriber))
+            while True:
+                item = await subscriber.queue.get()
+                if item is RESYNC:
+                    await websocket.send_text(await self._snapshot(sim_id, subscriber))
+                    continue
+                tick, frame = item
+                if tick is None or tick > subscriber.min_tick:
+                    await websocket.send_text(frame)
+        except (WebSocketDisconnect, ServiceError):
+            pass
+
+    async def _drain(self, websocket: WebSocket):
+        """Read (and ignore) client messages so a disconnect is noticed even while no frames flow."""
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    async def serve(self, websocket: WebSocket, sim_id: str):
+        self.loop = asyncio.get_running_loop()
+        await websocket.accept()
+        subscriber = Subscriber(self.queue_size)
+        subscribers = self._subscribers.setdefault(sim_id, set())
+        if not subscribers:
+            await asyncio.to_thread(self.service.watch, sim_id, True)
+        subscribers.add(subscriber)
+        sender = asyncio.create_task(self._send(websocket, sim_id, subscriber))
+        receiver = asyncio.create_task(self._drain(websocket))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            subscribers.discard(subscriber)
+            if not subscribers and self._subscribers.get(sim_id) is subscribers:
+                del self._subscribers[sim_id]
+                await asyncio.to_thread(self.service.watch, sim_id, False)
@@ -0,0 +1,33 @@
+import random
+import pytest
+from engine import SimulationEngine
+from models import CharacterCreate, SimulationConfig
+
+
+@pytest.fixture
+def archived_sim(tmp_path):
+    random.seed(0)
+    engine = SimulationEngine(archive_dir=str(tmp_path))
+    sim = engine.create_simulation(SimulationConfig(history_window=5))
+    for i in range(6):
+        engine.add_character(sim.id, CharacterCreate(name=f"C{i}"))
+    for _ in range(40):
+        engine.step(sim.id)
+    yield sim
+    engine.close()
+
+
+def test_filtered_queries_match_brute_force_with_archive(archived_sim):
+    events = archived_sim.events
+    assert events.archive is not None and events._offset > 0
+    everything, _ = events.page()
+    for since_tick in (0, 10, 30, 38):
+        in_range = [e for e in everything if e.tick >= since_tick]
+        for char_id in archived_sim.characters:
+            result, _ = events.query(since_tick=since_tick, participant=char_id)
+            assert [e.id for e in result] == [e.id for e in in_range if e.involves(char_id)]
+        for event_type in {e.type for e in everything}:
+            result, _ = events.query(since_tick=since_tick, event_type=event_type)
+            assert [e.id for e in result] == [e.id for e in in_range if e.type == event_type]
+        result, _ = events.query(since_tick=since_tick, min_importance=0.5)
+        assert [e.id for e in result] == [e.id for e in in_range if e.importance >= 0.5]
@@ -3,17 +3,17 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { createSimulation, getSimulations } from '@/lib/api';
-import type { SimulationState } from '@/lib/types';
+import type { SimulationSummary } from '@/lib/types';
 
 export default function TitleScreen() {
   const router = useRouter();
   const [creating, setCreating] = useState(false);
-  const [recentSims, setRecentSims] = useState<SimulationState[]>([]);
+  const [recentSims, setRecentSims] = useState<SimulationSummary[]>([]);
   const [loadError, setLoadError] = useState(false);
 
   useEffect(() => {
-    getSimulations()
-      .then((sims) => setRecentSims(sims.slice(0, 5)))
+    getSimulations({ limit: 5 })
+      .then(setRecentSims)
       .catch(() => setLoadError(true));
   }, []);
 
@@ -128,7 +128,7 @@ export default function TitleScreen() {
                       TICK {String(sim.tick).padStart(3, '0')}
                     </span>
                     <span className="text-pixel-xs text-gray-600">
-                      {Object.keys(sim.characters).length} AGENTS
+                      {sim.population} AGENTS
                     </span>
                     <span className="text-pixel-xs text-neon-cyan opacity-0 group-hover:opacity-100 transition-opacity">
                       LOAD →
@@ -1,9 +1,11 @@
 'use client';
 
-import { useEffect, useRef, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback } from 'react';
 import { useParams, useRouter } from 'next/navigation';
 import { useSimStore } from '@/lib/store';
-import { getSimulation, stepSimulation, updateConfig, addCharacter } from '@/lib/api';
+import {
+  getSimulation, getSimulationDelta, stepSimulationDelta, startSimulation, pauseSimulation, updateConfig, addCharacter,
+} from '@/lib/api';
 import type { SimulationConfig, CharacterCreate, PersonalityTraits } from '@/lib/types';
 import CharacterCard from '@/components/CharacterCard';
 import PixelCanvas from '@/components/PixelCanvas';
@@ -28,16 +30,17 @@ export default function SimulationPage() {
     selectCharacter,
     addEvents,
     addChatMessages,
+    applyDelta,
     setRunning,
     setAutoPlaySpeed,
     setActivePanel,
+    connectStream,
   } = useSimStore();
 
   const [stepping, setStepping] = useState(false);
   const [showSettings, setShowSettings] = useState(false);
   const [showAddChar, setShowAddChar] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const intervalRef = useRef<NodeJS.Timeout | null>(null);
 
   useEffect(() => {
     getSimulation(simId)
@@ -46,16 +49,18 @@ export default function SimulationPage() {
         if (sim.chat_log) {
           addChatMessages(sim.chat_log);
         }
+        setRunning(sim.running);
         setError(null);
       })
       .catch((e) => setError(e.message));
-  }, [simId, setSimulation, addChatMessages]);
+  }, [simId, setSimulation, addChatMessages, setRunning]);
 
   const doStep = useCallback(async () => {
     setStepping(true);
     try {
-      const result = await stepSimulation(simId);
-      setSimulation(result.state);
+      const tick = useSimStore.getState().simulation?.tick ?? 0;
+      const result = await stepSimulationDelta(simId, tick);
+      applyDelta(result.delta);
       addEvents(result.events);
       if (result.chat_messages) {
         addChatMessages(result.chat_messages);
@@ -67,19 +72,27 @@ export default function SimulationPage() {
     } finally {
       setStepping(false);
     }
-  }, [simId, setSimulation, addEvents, addChatMessages, setRunning]);
+  }, [simId, applyDelta, addEvents, addChatMessages, setRunning]);
+
+  // Ticks arrive over the stream whether they come from the background runner, STEP or another client.
+  useEffect(() => connectStream(simId), [simId, connectStream]);
 
   useEffect(() => {
-    if (isRunning) {
-      intervalRef.current = setInterval(doStep, autoPlaySpeed);
-    } else if (intervalRef.current) {
-      clearInterval(intervalRef.current);
-      intervalRef.current = null;
+    if (!isRunning) return;
+    startSimulation(simId, 1000 / autoPlaySpeed).catch((e) => {
+      setError(e instanceof Error ? e.message : 'Start failed');
+      setRunning(false);
+    });
+  }, [isRunning, autoPlaySpeed, simId, setRunning]);
+
+  const togglePlay = useCallback(() => {
+    if (!isRunning) {
+      setRunning(true);
+      return;
     }
-    return () => {
-      if (intervalRef.current) clearInterval(intervalRef.current);
-    };
-  }, [isRunning, autoPlaySpeed, doStep]);
+    setRunning(false);
+    pauseSimulation(simId).catch((e) => setError(e instanceof Error ? e.message : 'Pause failed'));
+  }, [isRunning, simId, setRunning]);
 
   const characters = simulation ? Object.values(simulation.characters) : [];
   const selectedCharacter = selectedCharacterId && simulation ? simulation.characters[selectedCharacterId] : null;
@@ -135,7 +148,7 @@ export default function SimulationPage() {
           isRunning={isRunning}
           autoPlaySpeed={autoPlaySpeed}
           onStep={doStep}
-          onTogglePlay={() => setRunning(!isRunning)}
+          onTogglePlay={togglePlay}
           onSpeedChange={setAutoPlaySpeed}
           onOpenSettings={() => setShowSettings(true)}
           stepping={stepping}
@@ -251,8 +264,7 @@ export default function SimulationPage() {
           onClose={() => setShowAddChar(false)}
           onAdd={async (data) => {
             await addCharacter(simId, data);
-            const sim = await getSimulation(simId);
-            setSimulation(sim);
+            applyDelta(await getSimulationDelta(simId, simulation?.tick ?? 0));
             setShowAddChar(false);
           }}
         />
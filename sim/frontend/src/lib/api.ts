@@ -6,11 +6,25 @@ import type {
   Memory,
   Action,
   SimEvent,
+  EventType,
   ChatMessage,
+  Coalition,
+  AdvanceSummary,
+  RunStatus,
+  SimulationDelta,
+  SimulationSummary,
 } from './types';
 
 const BASE = '/api';
 
+// Next's rewrites don't proxy WebSockets, so the stream connects to the backend directly.
+const WS_BASE = process.env.NEXT_PUBLIC_WS_URL;
+
+export function simulationStreamUrl(id: string): string {
+  const base = WS_BASE ?? `${window.location.protocol === 'https:' ? 'wss' : 'ws'}://${window.location.hostname}:8000`;
+  return `${base}/ws/simulations/${id}`;
+}
+
 async function request<T>(path: string, options?: RequestInit): Promise<T> {
   const res = await fetch(`${BASE}${path}`, {
     headers: { 'Content-Type': 'application/json' },
@@ -23,8 +37,12 @@ async function request<T>(path: string, options?: RequestInit): Promise<T> {
   return res.json();
 }
 
-export async function getSimulations(): Promise<SimulationState[]> {
-  return request('/simulations');
+export async function getSimulations(page: { cursor?: number; limit?: number } = {}): Promise<SimulationSummary[]> {
+  const params = new URLSearchParams();
+  if (page.cursor !== undefined) params.set('cursor', String(page.cursor));
+  if (page.limit !== undefined) params.set('limit', String(page.limit));
+  const query = params.toString() ? `?${params}` : '';
+  return request(`/simulations${query}`);
 }
 
 export async function createSimulation(config?: Partial<SimulationConfig>): Promise<SimulationState> {
@@ -34,14 +52,66 @@ export async function createSimulation(config?: Partial<SimulationConfig>): Prom
   });
 }
 
-export async function getSimulation(id: string): Promise<SimulationState> {
-  return request(`/simulations/${id}`);
+export interface Projection {
+  fields?: string[];
+  exclude?: string[];
+}
+
+function projectionQuery(projection: Projection): string {
+  const params = new URLSearchParams();
+  for (const field of projection.fields ?? []) params.append('fields', field);
+  for (const field of projection.exclude ?? []) params.append('exclude', field);
+  return params.toString() ? `?${params}` : '';
+}
+
+export async function getSimulation(id: string, projection: Projection = {}): Promise<SimulationState> {
+  return request(`/simulations/${id}${projectionQuery(projection)}`);
+}
+
+export async function getSimulationDelta(id: string, sinceTick: number): Promise<SimulationDelta> {
+  return request(`/simulations/${id}?since_tick=${sinceTick}`);
 }
 
 export async function stepSimulation(id: string): Promise<{ events: SimEvent[]; state: SimulationState; chat_messages: ChatMessage[] }> {
   return request(`/simulations/${id}/step`, { method: 'POST' });
 }
 
+export async function stepSimulationDelta(
+  id: string,
+  sinceTick: number,
+): Promise<{ events: SimEvent[]; delta: SimulationDelta; chat_messages: ChatMessage[] }> {
+  return request(`/simulations/${id}/step?since_tick=${sinceTick}`, { method: 'POST' });
+}
+
+export interface AdvanceOptions {
+  ticks?: number;
+  untilTick?: number;
+  stopOn?: EventType[];
+  includeState?: boolean;
+}
+
+export async function advanceSimulation(id: string, options: AdvanceOptions): Promise<AdvanceSummary> {
+  const params = new URLSearchParams();
+  if (options.ticks !== undefined) params.set('ticks', String(options.ticks));
+  if (options.untilTick !== undefined) params.set('until_tick', String(options.untilTick));
+  for (const type of options.stopOn ?? []) params.append('stop_on', type);
+  if (options.includeState) params.set('include_state', 'true');
+  return request(`/simulations/${id}/advance?${params}`, { method: 'POST' });
+}
+
+export async function startSimulation(id: string, tickRate?: number): Promise<RunStatus> {
+  const query = tickRate !== undefined ? `?tick_rate=${tickRate}` : '';
+  return request(`/simulations/${id}/start${query}`, { method: 'POST' });
+}
+
+export async function pauseSimulation(id: string): Promise<RunStatus> {
+  return request(`/simulations/${id}/pause`, { method: 'POST' });
+}
+
+export async function resumeSimulation(id: string): Promise<RunStatus> {
+  return request(`/simulations/${id}/resume`, { method: 'POST' });
+}
+
 export async function updateConfig(id: string, config: Partial<SimulationConfig>): Promise<SimulationState> {
   return request(`/simulations/${id}/config`, {
     method: 'PATCH',
@@ -60,8 +130,8 @@ export async function addCharacter(simId: string, character: CharacterCreate): P
   });
 }
 
-export async function getCharacter(simId: string, charId: string): Promise<Character> {
-  return request(`/simulations/${simId}/characters/${charId}`);
+export async function getCharacter(simId: string, charId: string, projection: Projection = {}): Promise<Character> {
+  return request(`/simulations/${simId}/characters/${charId}${projectionQuery(projection)}`);
 }
 
 export async function removeCharacter(simId: string, charId: string): Promise<{ ok: true }> {
@@ -76,12 +146,43 @@ export async function getReasoning(simId: string, charId: string): Promise<{ rea
   return request(`/simulations/${simId}/characters/${charId}/reasoning`);
 }
 
-export async function getEvents(simId: string, sinceTick?: number): Promise<SimEvent[]> {
-  const query = sinceTick !== undefined ? `?since_tick=${sinceTick}` : '';
+export interface EventQuery {
+  untilTick?: number;
+  type?: EventType;
+  participant?: string;
+  minImportance?: number;
+  cursor?: number;
+  limit?: number;
+}
+
+export async function getEvents(simId: string, sinceTick?: number, filters: EventQuery = {}): Promise<SimEvent[]> {
+  const params = new URLSearchParams();
+  if (sinceTick !== undefined) params.set('since_tick', String(sinceTick));
+  if (filters.untilTick !== undefined) params.set('until_tick', String(filters.untilTick));
+  if (filters.type !== undefined) params.set('type', filters.type);
+  if (filters.participant !== undefined) params.set('participant', filters.participant);
+  if (filters.minImportance !== undefined) params.set('min_importance', String(filters.minImportance));
+  if (filters.cursor !== undefined) params.set('cursor', String(filters.cursor));
+  if (filters.limit !== undefined) params.set('limit', String(filters.limit));
+  const query = params.toString() ? `?${params}` : '';
   return request(`/simulations/${simId}/events${query}`);
 }
 
-export async function getChat(simId: string, sinceTick?: number): Promise<ChatMessage[]> {
-  const query = sinceTick !== undefined ? `?since_tick=${sinceTick}` : '';
+export async function getChat(
+  simId: string,
+  sinceTick?: number,
+  page: { untilTick?: number; cursor?: number; limit?: number } = {},
+): Promise<ChatMessage[]> {
+  const params = new URLSearchParams();
+  if (sinceTick !== undefined) params.set('since_tick', String(sinceTick));
+  if (page.untilTick !== undefined) params.set('until_tick', String(page.untilTick));
+  if (page.cursor !== undefined) params.set('cursor', String(page.cursor));
+  if (page.limit !== undefined) params.set('limit', String(page.limit));
+  const query = params.toString() ? `?${params}` : '';
   return request(`/simulations/${simId}/chat${query}`);
 }
+
+export async function getCoalitions(simId: string, minSize?: number): Promise<Coalition[]> {
+  const query = minSize !== undefined ? `?min_size=${minSize}` : '';
+  return request(`/simulations/${simId}/coalitions${query}`);
+}
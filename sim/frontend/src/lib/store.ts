@@ -1,5 +1,6 @@
 import { create } from 'zustand';
-import type { SimulationState, SimEvent, ChatMessage } from './types';
+import type { SimulationState, SimEvent, ChatMessage, Character, StreamFrame, SimulationDelta } from './types';
+import { getEvents, getChat, simulationStreamUrl } from './api';
 
 interface SimStore {
   simulation: SimulationState | null;
@@ -19,9 +20,42 @@ interface SimStore {
   setAutoPlaySpeed: (speed: number) => void;
   setInspectorTab: (tab: 'stats' | 'memory' | 'relations' | 'mind') => void;
   setActivePanel: (panel: 'events' | 'chat') => void;
+  applyDelta: (delta: SimulationDelta) => void;
+  applyFrame: (simId: string, frame: StreamFrame) => void;
+  connectStream: (simId: string) => () => void;
 }
 
-export const useSimStore = create<SimStore>((set) => ({
+function withoutDuplicates<T extends { id: string }>(existing: T[], incoming: T[]): T[] {
+  const seen = new Set(existing.map((item) => item.id));
+  return incoming.filter((item) => !seen.has(item.id));
+}
+
+type ChangeSet = Pick<SimulationDelta, 'tick' | 'running' | 'characters' | 'removed_characters'> & Partial<Pick<SimulationDelta, 'environment' | 'config' | 'alliances' | 'full'>>;
+
+function applyChanges(sim: SimulationState, changes: ChangeSet): SimulationState {
+  // A full delta lists every character, so anything not in it is gone.
+  const characters: Record<string, Character> = changes.full ? {} : { ...sim.characters };
+  for (const [id, delta] of Object.entries(changes.characters)) {
+    const current = characters[id];
+    characters[id] = current
+      ? { ...current, ...delta, memory: { ...current.memory, ...delta.memory } } as Character
+      : delta as Character;
+  }
+  for (const id of changes.removed_characters) {
+    delete characters[id];
+  }
+  return {
+    ...sim,
+    tick: changes.tick,
+    running: changes.running,
+    config: changes.config ?? sim.config,
+    characters,
+    environment: { ...sim.environment, ...changes.environment },
+    alliances: changes.alliances ?? sim.alliances,
+  };
+}
+
+export const useSimStore = create<SimStore>((set, get) => ({
   simulation: null,
   selectedCharacterId: null,
   events: [],
@@ -34,13 +68,70 @@ export const useSimStore = create<SimStore>((set) => ({
   setSimulation: (sim) => set({ simulation: sim, events: sim.events }),
   selectCharacter: (id) => set({ selectedCharacterId: id }),
   addEvents: (events) => set((state) => ({
-    events: [...state.events, ...events.filter(e => !state.events.find(ex => ex.id === e.id))],
+    events: [...state.events, ...withoutDuplicates(state.events, events)],
   })),
   addChatMessages: (messages) => set((state) => ({
-    chatMessages: [...state.chatMessages, ...messages.filter(m => !state.chatMessages.find(cm => cm.id === m.id))],
+    chatMessages: [...state.chatMessages, ...withoutDuplicates(state.chatMessages, messages)],
   })),
   setRunning: (running) => set({ isRunning: running }),
   setAutoPlaySpeed: (speed) => set({ autoPlaySpeed: speed }),
   setInspectorTab: (tab) => set({ inspectorTab: tab }),
   setActivePanel: (panel) => set({ activePanel: panel }),
+
+  applyDelta: (delta) => {
+    const sim = get().simulation;
+    // Skip deltas that would leave a gap or roll back newer stream state.
+    if (!sim || sim.id !== delta.id || delta.since_tick > sim.tick || delta.tick < sim.tick) return;
+    set({ simulation: applyChanges(sim, delta), isRunning: delta.running });
+  },
+
+  applyFrame: (simId, frame) => {
+    const sim = get().simulation;
+    if (!sim || sim.id !== simId) return;
+    switch (frame.type) {
+      case 'tick':
+        if (frame.tick <= sim.tick) break;
+        set({ simulation: applyChanges(sim, frame), isRunning: frame.running });
+        get().addEvents(frame.events);
+        get().addChatMessages(frame.chat_messages);
+        break;
+      case 'snapshot': {
+        const lastTick = sim.tick;
+        set({
+          simulation: { ...sim, ...frame.state, events: sim.events, chat_log: sim.chat_log },
+          isRunning: frame.state.running,
+        });
+        // The server dropped frames for us; backfill the history they carried.
+        if (frame.tick > lastTick) {
+          getEvents(simId, lastTick).then(get().addEvents).catch(() => {});
+          getChat(simId, lastTick).then(get().addChatMessages).catch(() => {});
+        }
+        break;
+      }
+      case 'status':
+        set({ simulation: { ...sim, running: frame.running }, isRunning: frame.running });
+        break;
+    }
+  },
+
+  connectStream: (simId) => {
+    let socket: WebSocket | null = null;
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout> | null = null;
+
+    const open = () => {
+      socket = new WebSocket(simulationStreamUrl(simId));
+      socket.onmessage = (message) => get().applyFrame(simId, JSON.parse(message.data) as StreamFrame);
+      socket.onclose = () => {
+        if (!closed) retry = setTimeout(open, 2000);
+      };
+    };
+    open();
+
+    return () => {
+      closed = true;
+      if (retry) clearTimeout(retry);
+      socket?.close();
+    };
+  },
 }));
@@ -16,6 +16,12 @@ export interface EmotionalState {
   sadness: number;
 }
 
+export interface MemorySummary {
+  count: number;
+  betrayals: number;
+  cooperations: number;
+}
+
 export interface MemoryEntry {
   id: string;
   tick: number;
@@ -23,6 +29,7 @@ export interface MemoryEntry {
   importance: number;
   related_characters: string[];
   emotional_context: EmotionalState;
+  summary: MemorySummary | null;
 }
 
 export interface Memory {
@@ -69,6 +76,27 @@ export interface CharacterCreate {
 
 export type EventType = 'interaction' | 'environmental' | 'decision' | 'emergent' | 'alliance_formed' | 'conflict' | 'negotiation' | 'resource_change' | 'emotional_shift';
 
+export type EventScope = 'local' | 'global';
+
+export interface ResourceDelta {
+  character_id: string;
+  resource: string;
+  amount: number;
+  cap: number | null;
+}
+
+export interface RelationshipDelta {
+  character_id: string;
+  target_id: string;
+  amount: number;
+}
+
+export interface AllianceDelta {
+  character_id: string;
+  target_id: string;
+  allied: boolean;
+}
+
 export interface SimEvent {
   id: string;
   tick: number;
@@ -76,8 +104,12 @@ export interface SimEvent {
   title: string;
   description: string;
   participants: string[];
+  scope: EventScope;
   outcomes: string[];
   importance: number;
+  resource_deltas: ResourceDelta[];
+  relationship_deltas: RelationshipDelta[];
+  alliance_deltas: AllianceDelta[];
 }
 
 export interface Location {
@@ -100,6 +132,30 @@ export interface SimulationConfig {
   information_symmetry: number;
   resource_scarcity: number;
   max_ticks: number;
+  history_window: number | null;
+  memory_budget: number | null;
+  memory_compaction: boolean;
+}
+
+export type StopReason = 'ticks' | 'until_tick' | 'max_ticks' | 'event';
+
+export interface AdvanceSummary {
+  start_tick: number;
+  tick: number;
+  ticks_run: number;
+  stop_reason: StopReason;
+  event_count: number;
+  chat_count: number;
+  event_counts: Partial<Record<EventType, number>>;
+  stop_event: SimEvent | null;
+  state: SimulationState | null;
+}
+
+export interface RunStatus {
+  sim_id: string;
+  running: boolean;
+  tick: number;
+  tick_rate: number;
 }
 
 export interface SimulationState {
@@ -112,6 +168,7 @@ export interface SimulationState {
   running: boolean;
   created_at: number;
   chat_log: ChatMessage[];
+  alliances: Alliances;
 }
 
 export interface ChatMessage {
@@ -126,3 +183,63 @@ export interface ChatMessage {
   is_thought: boolean;
   action_context: string;
 }
+
+export interface Coalition {
+  members: string[];
+  names: string[];
+  formed_tick: number | null;
+}
+
+export interface Alliances {
+  allies: Record<string, string[]>;
+  formed: Record<string, number>;
+}
+
+export type CharacterDelta = Partial<Omit<Character, 'memory'>> & { memory?: Partial<Memory> };
+
+export interface SimulationSummary {
+  id: string;
+  tick: number;
+  population: number;
+  config: SimulationConfig;
+  running: boolean;
+  created_at: number;
+}
+
+export interface SimulationDelta {
+  id: string;
+  since_tick: number;
+  tick: number;
+  running: boolean;
+  config: SimulationConfig;
+  characters: Record<string, CharacterDelta>;
+  removed_characters: string[];
+  environment: Partial<Environment>;
+  alliances: Alliances | null;
+  full: boolean;
+}
+
+export interface TickFrame {
+  type: 'tick';
+  tick: number;
+  running: boolean;
+  events: SimEvent[];
+  chat_messages: ChatMessage[];
+  characters: Record<string, CharacterDelta>;
+  removed_characters: string[];
+  environment?: Partial<Environment>;
+  alliances?: Alliances;
+}
+
+export interface SnapshotFrame {
+  type: 'snapshot';
+  tick: number;
+  state: Omit<SimulationState, 'events' | 'chat_log'>;
+}
+
+export interface StatusFrame {
+  type: 'status';
+  running: boolean;
+}
+
+export type StreamFrame = TickFrame | SnapshotFrame | StatusFrame;